@@ -0,0 +1,179 @@
+"""
+Scores many single-card placements on one board at once.
+
+score_placements() rescores a board after one placement by joining the
+longest paths into and out of the new card's cell, read from the path
+tables of a ScoredBoard. Here those tables are laid out as NumPy arrays
+(ranks, species, forward and backward path lengths and monospecies path
+tables, one row per occupied cell) and the joins are done for a whole batch
+of (card, cell) placements as array operations, giving an N x 6 matrix of
+per-species scores, in species order.
+
+NumPy is optional. Without it, score_batch() builds the same matrix as a
+list of rows from score_placements(), which stays the reference.
+"""
+
+from typing import List, Tuple
+
+import tracing
+from board import CARD_RANK, CARD_SPECIES, NEIGHBOUR_OFFSETS
+from scoring import ALL_SPECIES, ScoredBoard, score_placements
+
+# NumPy takes longer to import than the rest of the bot, so it is only
+# imported the first time available() is asked, not at start-up.
+np = None
+_imported = False
+
+# Missing paths are stored as NONE rather than -1, low enough that any sum
+# with one in it stays negative, below every score, so no masks are needed.
+NONE = -1000
+
+
+def available() -> bool:
+    """Whether batches are scored with NumPy, importing it on first use."""
+    global np, _imported, _MONO_LENGTH_SCORE, _CARD_RANK, _CARD_SPECIES
+    if not _imported:
+        _imported = True
+        try:
+            import numpy
+        except ImportError:
+            return False
+        np = numpy
+        # A monospecies path joined at the new card from a prefix of a cards
+        # and a suffix of b cards, both counting the card, scores
+        # 2 * (a + b - 1) when it is 4 to 8 cards long.
+        lengths = np.arange(9)
+        joined_length = lengths[:, None] + lengths[None, :] - 1
+        _MONO_LENGTH_SCORE = np.where(
+            (lengths[:, None] >= 1)
+            & (lengths[None, :] >= 1)
+            & (joined_length >= 4)
+            & (joined_length <= 8),
+            2 * joined_length,
+            NONE,
+        ).reshape(1, 9, 9)
+        _CARD_RANK = np.array(CARD_RANK)
+        _CARD_SPECIES = np.array(CARD_SPECIES)
+    return np is not None
+
+
+class BoardArrays:
+    """
+    The path tables of a ScoredBoard as arrays with one row per occupied
+    cell, plus a last row standing for an empty neighbour: rank 0, no
+    species and no paths, so it never joins anything. The rows of the four
+    neighbours of each empty cell a card may go on are kept too.
+    """
+
+    def __init__(self, scored: ScoredBoard):
+        if not available():
+            raise ImportError("BoardArrays needs NumPy")
+        self.scored = scored
+        grid = scored.board.grid
+        cells = list(scored.board.cells())
+        self.rows = {cell: row for row, cell in enumerate(cells)}
+        self.empty_row = len(cells)
+        self.scores = np.array([scored.scores[species] for species in ALL_SPECIES])
+
+        species = [CARD_SPECIES[grid[cell]] for cell in cells]
+        self.rank = np.array([CARD_RANK[grid[cell]] for cell in cells] + [0])
+        self.species = np.array(species + [-1])
+        self.reach = _table([scored.reach[cell] for cell in cells], len(ALL_SPECIES))
+        self.back = _table([scored.back[cell] for cell in cells], len(ALL_SPECIES))
+        # Each cell's monospecies tables for its own species.
+        self.mono_reach = _table([scored.mono_reach[cell] for cell in cells], 9)
+        self.mono_back = _table([scored.mono_back[cell] for cell in cells], 9)
+
+        self.positions = {}
+        self.neighbours = []
+        self.neighbour_table = None
+        self._add_cells(scored.board.play_cells())
+
+    def _add_cells(self, cells):
+        rows, empty_row = self.rows, self.empty_row
+        for cell in cells:
+            self.positions[cell] = len(self.neighbours)
+            self.neighbours.append(
+                [rows.get(cell + offset, empty_row) for offset in NEIGHBOUR_OFFSETS]
+            )
+        self.neighbour_table = np.array(self.neighbours).reshape(-1, 4)
+
+    def neighbour_rows(self, cells: List[int]):
+        """The rows of the four neighbours of each of the empty `cells`."""
+        positions = self.positions
+        missing = {cell for cell in cells if cell not in positions}
+        if missing:
+            self._add_cells(missing)
+        index = np.fromiter((positions[cell] for cell in cells), int, len(cells))
+        return self.neighbour_table[index]
+
+
+def _table(rows: list, width: int):
+    """An array of table rows plus an empty row, with NONE for no path."""
+    table = np.array(rows + [[-1] * width]).reshape(-1, width)
+    return np.where(table < 0, NONE, table)
+
+
+def score_batch(arrays, placements: List[Tuple[int, int]]):
+    """
+    The per-species scores, in species order, of the board with each
+    (card id, cell) placement made on its own: an N x 6 integer array, or
+    without NumPy a list of N rows. `arrays` is BoardArrays(scored), or just
+    the ScoredBoard without NumPy.
+    """
+    if not available():
+        return _score_rows(arrays, placements)
+    count = len(placements)
+    if tracing.enabled:
+        tracing.counters["placements_scored"] += count
+    if count == 0:
+        return np.zeros((0, len(ALL_SPECIES)), dtype=int)
+    cards = np.fromiter((card for card, _ in placements), int, count)
+    rows = arrays.neighbour_rows([cell for _, cell in placements])
+    rank = _CARD_RANK[cards]
+    species = _CARD_SPECIES[cards]
+    batch = np.arange(count)
+
+    neighbour_rank = arrays.rank[rows]
+    below = (neighbour_rank < rank[:, None])[:, :, None]
+    above = (neighbour_rank > rank[:, None])[:, :, None]
+    # Best path into the cell per species, from the neighbours below it, and
+    # best path out of it, from the neighbours above.
+    prefix = np.where(below, arrays.reach[rows], NONE).max(axis=1)
+    suffix = np.where(above, arrays.back[rows], NONE).max(axis=1)
+    scores = np.maximum(arrays.scores, prefix + 1 + suffix)
+
+    # Paths of the card's own species that start or end on the card.
+    start_bonus = (rank == 1).astype(int)
+    end_bonus = 2 * (rank == 8)
+    own = np.maximum(scores[batch, species], prefix[batch, species] + 1 + end_bonus)
+    own = np.maximum(own, start_bonus + 1 + suffix[batch, species])
+
+    # Monospecies paths through the card, from every prefix and suffix length.
+    same = (arrays.species[rows] == species[:, None])[:, :, None]
+    mono_prefix = np.full((count, 9), NONE)
+    mono_prefix[:, 1] = start_bonus
+    mono_prefix[:, 2:] = np.where(
+        below & same, arrays.mono_reach[rows], NONE
+    ).max(axis=1)[:, 1:8]
+    mono_suffix = np.full((count, 9), NONE)
+    mono_suffix[:, 1] = end_bonus
+    mono_suffix[:, 2:] = np.where(
+        above & same, arrays.mono_back[rows], NONE
+    ).max(axis=1)[:, 1:8]
+    joined = mono_prefix[:, :, None] + mono_suffix[:, None, :] + _MONO_LENGTH_SCORE
+    own = np.maximum(own, joined.reshape(count, -1).max(axis=1))
+    scores[batch, species] = own
+    return scores
+
+
+def _score_rows(scored: ScoredBoard, placements: List[Tuple[int, int]]) -> list:
+    by_cell = {}
+    for index, (card, cell) in enumerate(placements):
+        by_cell.setdefault(cell, []).append((index, card))
+    rows = [None] * len(placements)
+    for cell, entries in by_cell.items():
+        cards = [card for _, card in entries]
+        for (index, _), scores in zip(entries, score_placements(scored, cards, cell)):
+            rows[index] = [scores[species] for species in ALL_SPECIES]
+    return rows
@@ -0,0 +1,212 @@
+"""
+Benchmarks for the scoring kernels and the per-subturn handlers.
+
+Runs offline on a fixed corpus of generated states, from an empty board to
+40-card arboretums, and reports p50/p95/max latency and ops/sec for each
+kernel and game stage. Every call starts from cold caches, as the first
+call on a new board does. Results are written as JSON and compared with a
+stored baseline:
+
+    python bench.py                     # run, write results, compare
+    python bench.py --save-baseline     # run and store as the new baseline
+"""
+
+import argparse
+import json
+import random
+import sys
+from copy import deepcopy
+from time import perf_counter
+
+import scoring
+from discard import get_discard_card
+from draw import assess_draw
+from place import get_best_play
+from scoring import ALL_CARDS, ALL_SPECIES, calculate_all_scores
+from scoring import calculate_scoring_probability
+from utils import get_valid_play_coordinates
+from session import GameSession
+
+# Game stage -> sizes of our play area in that stage's states.
+STAGES = {
+    "early": [0, 1, 3, 5],
+    "mid": [8, 12, 16],
+    "late": [20, 30, 40],
+}
+STATES_PER_SIZE = 3
+DEFAULT_BASELINE = "bench_baseline.json"
+DEFAULT_OUTPUT = "bench_results.json"
+# A case regresses when its best_p50 is this many times the baseline's.
+REGRESSION_TOLERANCE = 2.0
+
+
+def grow_play_area(rng: random.Random, cards: list) -> dict:
+    play_area = {}
+    for card in cards:
+        coord = rng.choice(sorted(get_valid_play_coordinates(play_area)))
+        play_area.setdefault(str(coord[0]), {})[str(coord[1])] = list(card)
+    return play_area
+
+
+def make_state(rng: random.Random, size: int) -> dict:
+    """Deals a plausible mid-turn state with `size` cards in our play area."""
+    deck = sorted(ALL_CARDS)
+    rng.shuffle(deck)
+    ours, deck = deck[:size], deck[size:]
+    hand, deck = deck[:7], deck[7:]
+    opponent_hand, deck = deck[:7], deck[7:]
+    theirs_size = min(size, len(deck) // 2)
+    theirs, deck = deck[:theirs_size], deck[theirs_size:]
+    discard_size = min(len(deck) // 3, rng.randint(0, 4))
+    discard, deck = deck[:discard_size], deck[discard_size:]
+    opponent_discard, deck = deck[:discard_size], deck[discard_size:]
+    hidden = rng.randint(max(0, 7 - size // 3), 7)
+    return {
+        "deck": len(deck),
+        "hand": [list(card) for card in hand],
+        "discard": [list(card) for card in discard],
+        "opponentDiscard": [list(card) for card in opponent_discard],
+        "playArea": grow_play_area(rng, ours),
+        "opponentPlayArea": grow_play_area(rng, theirs),
+        "opponentHand": (
+            [None] * hidden + [list(card) for card in opponent_hand[hidden:]]
+        ),
+        "turn": size * 2,
+        "subTurn": 0,
+        "activeTurn": True,
+        "previousTurn": {"move": False, "metaData": False},
+    }
+
+
+def make_corpus(seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {
+        stage: [
+            make_state(rng, size) for size in sizes for _ in range(STATES_PER_SIZE)
+        ]
+        for stage, sizes in STAGES.items()
+    }
+
+
+def reset_caches():
+    scoring.score_cache.clear()
+    scoring._hand_majority_probabilities.cache_clear()
+
+
+def probability_all_species(state: dict):
+    for species in ALL_SPECIES:
+        calculate_scoring_probability(species, state)
+
+
+CASES = {
+    "calculate_all_scores": lambda state: calculate_all_scores(state["playArea"]),
+    "calculate_scoring_probability": probability_all_species,
+    # Each call gets a new session, so it starts from cold caches.
+    "get_best_play": lambda state: get_best_play(state, GameSession()),
+    "assess_draw": lambda state: assess_draw(state, GameSession()),
+    "get_discard_card": lambda state: get_discard_card(state, GameSession()),
+}
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run(corpus: dict, repeats: int) -> dict:
+    random.seed(0)
+    results = {}
+    for case, function in CASES.items():
+        for stage, states in corpus.items():
+            samples = []
+            best_per_state = []
+            for state in states:
+                state_samples = []
+                for _ in range(repeats):
+                    state_copy = deepcopy(state)
+                    reset_caches()
+                    start = perf_counter()
+                    function(state_copy)
+                    state_samples.append(perf_counter() - start)
+                samples.extend(state_samples)
+                best_per_state.append(min(state_samples))
+            results[f"{case}/{stage}"] = {
+                # Median over states of the fastest repeat: the figure least
+                # disturbed by a busy host, used to detect regressions.
+                "best_p50": percentile(best_per_state, 0.5),
+                "p50": percentile(samples, 0.5),
+                "p95": percentile(samples, 0.95),
+                "max": max(samples),
+                "ops_per_sec": len(samples) / sum(samples),
+                "samples": len(samples),
+            }
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns the names of cases whose best_p50 regressed against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result["best_p50"] > previous["best_p50"] * tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def report(results: dict, baseline: dict):
+    print(
+        f"{'case':<40}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        f"{'ops/s':>12}{'vs base':>10}"
+    )
+    for name, result in results.items():
+        previous = baseline.get(name)
+        change = "-"
+        if previous:
+            change = f"{result['best_p50'] / previous['best_p50']:.2f}x"
+        print(
+            f"{name:<40}"
+            f"{result['p50'] * 1000:>10.3f}"
+            f"{result['p95'] * 1000:>10.3f}"
+            f"{result['max'] * 1000:>10.3f}"
+            f"{result['ops_per_sec']:>12.1f}"
+            f"{change:>10}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(make_corpus(args.seed), args.repeats)
+
+    try:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        baseline = {}
+
+    report(results, baseline)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for name in regressions:
+        print(f"Regression: {name}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
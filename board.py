@@ -0,0 +1,149 @@
+from array import array
+from typing import Dict, FrozenSet, Iterator, List, Set, Tuple
+
+from tables import CARD_RANK, CARD_SPECIES
+
+# Cards are encoded as small ints: species index * 8 + (rank - 1), so 0..47.
+# CARD_SPECIES and CARD_RANK decode them, from the prebuilt tables.
+SPECIES = ["J", "R", "C", "M", "O", "W"]
+SPECIES_INDEX = {species: index for index, species in enumerate(SPECIES)}
+
+# The grid is a flat square of cells addressed by offset. Every card is
+# placed within 48 steps of the first one, so a radius of 49 leaves room for
+# a ring of empty neighbours around the largest possible arboretum.
+RADIUS = 49
+SIDE = 2 * RADIUS + 1
+ORIGIN = RADIUS * SIDE + RADIUS
+EMPTY = -1
+
+# [(Up), (Down), (Right), (Left)]
+NEIGHBOUR_OFFSETS = (1, -1, SIDE, -SIDE)
+
+_EMPTY_GRID = array("b", [EMPTY]) * (SIDE * SIDE)
+
+
+def card_id(card) -> int:
+    """Encodes a card, e.g. ['W', 8] -> 47."""
+    return SPECIES_INDEX[card[0]] * 8 + card[1] - 1
+
+
+def card_of(card: int) -> Tuple[str, int]:
+    """Decodes a card id back into a (species, rank) tuple."""
+    return (SPECIES[CARD_SPECIES[card]], CARD_RANK[card])
+
+
+def cell_index(coord: Tuple[int, int]) -> int:
+    """Returns the grid offset of an (x, y) coordinate."""
+    return (coord[0] + RADIUS) * SIDE + coord[1] + RADIUS
+
+
+def cell_coord(cell: int) -> Tuple[int, int]:
+    """Returns the (x, y) coordinate of a grid offset."""
+    x, y = divmod(cell, SIDE)
+    return (x - RADIUS, y - RADIUS)
+
+
+class Board:
+    """
+    An arboretum stored as card ids in a flat grid, with the empty cells
+    adjacent to a card and the cells holding each species kept up to date as
+    cards are placed and removed.
+    """
+
+    __slots__ = ("grid", "frontier", "species_cells", "count")
+
+    def __init__(self):
+        self.grid = _EMPTY_GRID[:]
+        self.frontier: Set[int] = set()
+        self.species_cells: List[Set[int]] = [set() for _ in SPECIES]
+        self.count = 0
+
+    @classmethod
+    def from_play_area(cls, play_area: Dict[str, Dict[str, list]]) -> "Board":
+        """Builds a board from the JSON play area of a game state."""
+        board = cls()
+        for x_str, row in play_area.items():
+            x = int(x_str)
+            for y_str, card in row.items():
+                board.place(cell_index((x, int(y_str))), card_id(card))
+        return board
+
+    def copy(self) -> "Board":
+        """Returns an independent copy of the board."""
+        board = Board.__new__(Board)
+        board.grid = self.grid[:]
+        board.frontier = set(self.frontier)
+        board.species_cells = [set(cells) for cells in self.species_cells]
+        board.count = self.count
+        return board
+
+    def place(self, cell: int, card: int):
+        """Puts a card id on an empty cell."""
+        grid = self.grid
+        grid[cell] = card
+        self.count += 1
+        self.species_cells[CARD_SPECIES[card]].add(cell)
+        self.frontier.discard(cell)
+        for offset in NEIGHBOUR_OFFSETS:
+            if grid[cell + offset] == EMPTY:
+                self.frontier.add(cell + offset)
+
+    def remove(self, cell: int):
+        """
+        Takes the card off a cell, undoing place(). Undoing placements in
+        reverse order gives back the board exactly as it was.
+        """
+        grid = self.grid
+        card = grid[cell]
+        grid[cell] = EMPTY
+        self.count -= 1
+        self.species_cells[CARD_SPECIES[card]].discard(cell)
+        is_frontier = False
+        for offset in NEIGHBOUR_OFFSETS:
+            neighbour = cell + offset
+            if grid[neighbour] != EMPTY:
+                is_frontier = True
+            elif not self._touches_card(neighbour):
+                self.frontier.discard(neighbour)
+        if is_frontier:
+            self.frontier.add(cell)
+
+    def _touches_card(self, cell: int) -> bool:
+        grid = self.grid
+        return any(grid[cell + offset] != EMPTY for offset in NEIGHBOUR_OFFSETS)
+
+    def cells(self) -> Iterator[int]:
+        """Iterates over the occupied cells."""
+        for cells in self.species_cells:
+            yield from cells
+
+    def signature(self) -> FrozenSet[int]:
+        """Returns a key identifying the cards and the cells they sit on."""
+        grid = self.grid
+        return frozenset(cell * 48 + grid[cell] for cell in self.cells())
+
+    def layout_key(self) -> FrozenSet[int]:
+        """
+        Returns a key identifying the arrangement of cards regardless of
+        where it sits on the grid: each card is keyed with its offset from
+        the bottom-left corner of the board's bounding box.
+        """
+        return self.layout()[0]
+
+    def layout(self) -> Tuple[FrozenSet[int], int]:
+        """Returns layout_key() and the cell of the corner it is taken from."""
+        cells = list(self.cells())
+        if not cells:
+            return frozenset(), ORIGIN
+        min_x = min(cells) // SIDE
+        min_y = min(cell % SIDE for cell in cells)
+        corner = min_x * SIDE + min_y
+        grid = self.grid
+        key = frozenset(grid[cell] * SIDE * SIDE + cell - corner for cell in cells)
+        return key, corner
+
+    def play_cells(self) -> Set[int]:
+        """Returns the cells a card may be placed on."""
+        if self.count == 0:
+            return {ORIGIN}
+        return set(self.frontier)
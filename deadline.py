@@ -0,0 +1,42 @@
+from time import perf_counter
+
+
+class Deadline:
+    """
+    A wall-clock budget for one move. Handlers evaluate their best candidates
+    first and stop once it expires. A budget of None never expires.
+
+    checks counts the calls to expired() that returned False and ran_out
+    tells whether one returned True, so a recorded move can be repeated with
+    Deadline(checks=...), which expires after that many checks instead.
+    """
+
+    __slots__ = ("end", "limit", "checks", "ran_out")
+
+    def __init__(self, seconds: float = None, checks: int = None):
+        self.end = None if seconds is None else perf_counter() + seconds
+        self.limit = checks
+        self.checks = 0
+        self.ran_out = False
+
+    def expired(self) -> bool:
+        if self.limit is not None:
+            expired = self.checks >= self.limit
+        elif self.end is None:
+            return False
+        else:
+            expired = perf_counter() >= self.end
+        if expired:
+            self.ran_out = True
+        else:
+            self.checks += 1
+        return expired
+
+    def remaining(self) -> float:
+        """Seconds left, or None if there is no limit in time."""
+        if self.end is None:
+            return None
+        return max(0.0, self.end - perf_counter())
+
+
+NO_DEADLINE = Deadline()
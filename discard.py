@@ -1,8 +1,5 @@
-from copy import deepcopy
-import place
-from utils import get_valid_play_coordinates
-from scoring import get_weighted_scores
-from magic import DISCARD_CANDIDATE_COUNT
+import magic
+from deadline import NO_DEADLINE
 import sys
 
 
@@ -11,123 +8,93 @@ def eprint(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs)
 
 
-def get_cached_card_rankings():
+def get_card_rankings(state, session):
     """
-    Returns cached card rankings from place.py, sorted by score (lowest first).
+    Ranks our hand by the best placement value of each card on our play area,
+    read from the shared placement table (lowest first).
+
+    Args:
+        state: Game state dictionary
+        session: GameSession of the game
 
     Returns:
         List of (card, score) tuples sorted by score ascending
     """
-    return sorted(place.cached_card_scores, key=lambda x: x[1])
+    table = session.placement_table(state)
+    rankings = list(zip(state["hand"], table.best_values(state["hand"])))
+    return sorted(rankings, key=lambda x: x[1])
 
 
-def assess_card_placement_for_opponent(card, coord, state):
+def get_opponent_state(state):
     """
-    Simulates placing a card on the opponent's tableau and returns the score.
+    Returns the game state as the opponent sees it, so our scoring functions
+    can be run on their tableau. The view shares the play areas and piles with
+    `state` instead of copying them.
 
     Args:
-        card: Card tuple [species, rank]
-        coord: Coordinate tuple (x, y)
         state: Game state dictionary
 
     Returns:
-        Float score that opponent would get from this placement
+        Game state dictionary with the two sides swapped
     """
-    # Create a copy of the state for simulation
-    state_copy = deepcopy(state)
-
-    # Place the card on opponent's play area
-    x_key = str(coord[0])
-    y_key = str(coord[1])
-
-    opponent_area = state_copy["opponentPlayArea"]
-    if x_key in opponent_area:
-        opponent_area[x_key][y_key] = card
-    else:
-        opponent_area[x_key] = {y_key: card}
-
-    # Calculate weighted scores for opponent's modified tableau
-    # We need to create a state where opponent's area is treated as the main play area
     # Filter out None values from opponent's hand
     opponent_hand_filtered = [
-        card for card in state_copy["opponentHand"] if card is not None
+        card for card in state["opponentHand"] if card is not None
     ]
 
-    opponent_state = {
-        "playArea": state_copy["opponentPlayArea"],
+    return {
+        "playArea": state["opponentPlayArea"],
         "hand": opponent_hand_filtered,
-        "discard": state_copy["opponentDiscard"],
-        "opponentHand": state_copy["hand"],
-        "opponentDiscard": state_copy["discard"],
-        "opponentPlayArea": state_copy["playArea"],
-        "deck": state_copy["deck"],
-        "turn": state_copy["turn"],
-        "subTurn": state_copy["subTurn"],
-        "previousTurn": state_copy["previousTurn"],
+        "discard": state["opponentDiscard"],
+        "opponentHand": state["hand"],
+        "opponentDiscard": state["discard"],
+        "opponentPlayArea": state["playArea"],
+        "deck": state["deck"],
+        "turn": state["turn"],
+        "subTurn": state["subTurn"],
+        "previousTurn": state["previousTurn"],
     }
 
-    weighted_scores = get_weighted_scores(opponent_state)
-    return sum(weighted_scores.values())
 
-
-def get_opponent_best_score_for_card(card, state):
-    """
-    Finds the best possible score the opponent could achieve by placing this card.
-
-    Args:
-        card: Card tuple [species, rank]
-        state: Game state dictionary
-
-    Returns:
-        Float representing the highest score opponent could get with this card
-    """
-    coords = get_valid_play_coordinates(state["opponentPlayArea"])
-    best_score = 0
-
-    for coord in coords:
-        score = assess_card_placement_for_opponent(card, coord, state)
-        if score > best_score:
-            best_score = score
-
-    return best_score
-
-
-def get_discard_card(state, num_candidates=DISCARD_CANDIDATE_COUNT):
+def get_discard_card(state, session, num_candidates=None, deadline=NO_DEADLINE):
     """
     Determines the best card to discard using opponent simulation heuristic.
+    The candidates are evaluated together, in one pass; if the deadline has
+    expired before it, the card worst for us is discarded.
 
     Args:
         state: Game state dictionary
-        num_candidates: Number of worst-scoring cards to evaluate (default 4)
+        session: GameSession of the game
+        num_candidates: Number of worst-scoring cards to evaluate, or None
+            (default) for magic.DISCARD_CANDIDATE_COUNT
+        deadline: Deadline for the move
 
     Returns:
         Card tuple [species, rank] that should be discarded
     """
-    # Get our cached rankings (lowest scores first)
-    rankings = [
-        (card, score)
-        for card, score in get_cached_card_rankings()
-        if card in state["hand"]
-    ]
+    # Get our rankings (lowest scores first)
+    rankings = get_card_rankings(state, session)
 
     if not rankings:
-        eprint("Warning: No cached rankings available. Call get_best_play() first.")
-        return state["hand"][0] if state["hand"] else None
+        eprint("Warning: No cards in hand to discard.")
+        return None
 
     # Take the worst N cards from our perspective
-    candidates = rankings[: min(num_candidates, len(rankings))]
+    if num_candidates is None:
+        num_candidates = magic.DISCARD_CANDIDATE_COUNT
+    candidates = rankings[:num_candidates]
 
     if not candidates:
         return state["hand"][0] if state["hand"] else None
 
-    # Evaluate each candidate from opponent's perspective
-    opponent_scores = []
-    for card, our_score in candidates:
-        opponent_best_score = get_opponent_best_score_for_card(card, state)
-        opponent_scores.append((card, opponent_best_score))
-        # eprint(
-        #     f"Card {card}: Our score={our_score:.2f}, Opponent best score={opponent_best_score:.2f}"
-        # )
+    if deadline.expired():
+        return candidates[0][0]
+
+    # Evaluate the candidates from the opponent's perspective in one
+    # best_values() pass over all of them and the opponent's cells.
+    cards = [card for card, _ in candidates]
+    table = session.opponent_table(state)
+    opponent_scores = list(zip(cards, table.best_values(cards)))
 
     # Sort by opponent score (lowest first) - we want to discard the card
     # that gives the opponent the least benefit
@@ -171,9 +138,7 @@ if __name__ == "__main__":
         "previousTurn": {"move": ["R", 5], "metaData": False},
     }
 
-    # First call get_best_play to populate cache
-    best_play = place.get_best_play(test_state)
-    # print(f"Best play: {best_play}")
+    # Get discard recommendation
+    from session import GameSession
 
-    # Then get discard recommendation
-    discard_card = get_discard_card(test_state)
+    discard_card = get_discard_card(test_state, GameSession())
@@ -1,57 +1,64 @@
-from utils import get_valid_play_coordinates, assess_card_placement, sample_cards
-from scoring import ALL_CARDS
-import json
+from utils import sample_cards
 import sys
 import magic
+import pool
+from deadline import NO_DEADLINE, Deadline
+from protocol import send
+from session import GameSession
 
 
-def assess_draw(state: dict) -> int:
+def assess_draw(
+    state: dict, session: GameSession, deadline: Deadline = NO_DEADLINE
+) -> int:
+    """
+    Chooses where to draw from by comparing the best placement of each
+    discard pile's top card with the average over a sample of unknown cards.
+    The pile tops are evaluated first, then the cards in batches of
+    magic.DRAW_BATCH_SIZE; if the deadline expires the deck is judged on the
+    unknown cards evaluated so far.
+    """
 
     # eprint(f'discard: {state["discard"]}')
     # eprint(f'op: {state["opponentDiscard"]}')
 
-    coords = get_valid_play_coordinates(state["playArea"])
-    discard_scores = {
-        pile: assess_card(state[pile].pop(), coords, state)
-        for pile in ["discard", "opponentDiscard"]
-        if len(state[pile]) > 0
-    }
-    seen_cards = (
-        state["hand"]
-        + state["opponentHand"]
-        + state["discard"]
-        + state["opponentDiscard"]
-        + list(y for x in state["playArea"].values() for y in x.values())
-        + list(y for x in state["opponentPlayArea"].values() for y in x.values())
-    )
-    unknown_cards = ALL_CARDS - {tuple(card) for card in seen_cards if not card is None}
+    table = session.placement_table(state)
+    piles = [pile for pile in ["discard", "opponentDiscard"] if len(state[pile]) > 0]
     lim_calcs = magic.DRAW_LIM_CALCS
-    unknown_cards = sample_cards(unknown_cards, int(lim_calcs / len(coords)))
-    unknown_card_scores = [assess_card(card, coords, state) for card in unknown_cards]
-    avg = sum(unknown_card_scores) / len(unknown_card_scores)
-    discard_scores.update({"deck": avg * (1 / len(unknown_card_scores))})
+    unknown_cards = sample_cards(
+        table.unknown_cards, int(lim_calcs / len(table.cells))
+    )
+    cards = [state[pile][-1] for pile in piles] + list(unknown_cards)
+    if pool.running():
+        card_scores = pool.best_values(state, cards, deadline)
+    else:
+        card_scores = []
+        for start in range(0, len(cards), magic.DRAW_BATCH_SIZE):
+            card_scores.extend(
+                table.best_values(cards[start : start + magic.DRAW_BATCH_SIZE])
+            )
+            if deadline.expired():
+                break
+
+    discard_scores = dict(zip(piles, card_scores))
+    unknown_card_scores = card_scores[len(piles) :]
+    if unknown_card_scores or not discard_scores:
+        avg = sum(unknown_card_scores) / max(len(unknown_card_scores), 1)
+        discard_scores.update({"deck": avg * (1 / max(len(unknown_cards), 1))})
 
     return {"deck": 0, "discard": 1, "opponentDiscard": 2}[
         max(discard_scores, key=discard_scores.get)
     ]
 
 
-def assess_card(
-    card: tuple[str, int], coords: set[tuple[int, int]], state: dict
-) -> float:
-    return max([assess_card_placement(card, coord, state) for coord in coords])
-
-
 def eprint(*args, **kwargs):
     """Prints to stderr."""
     print(*args, file=sys.stderr, **kwargs)
 
 
-def draw(data: dict):
-    choice = assess_draw(data["state"])
+def draw(data: dict, session: GameSession, deadline: Deadline = NO_DEADLINE):
+    choice = assess_draw(data["state"], session, deadline)
     output = {
         "move": choice,
         "messageID": data["messageID"],
     }
-    # eprint(json.dumps(output))
-    print(json.dumps(output))
+    send(output)
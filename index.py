@@ -1,6 +1,17 @@
 from readLine import beginReadLine
+import magic
+import pool
+import recorder
+import tracing
 
 def main():
+    tracing.configure(magic.TRACE_OUTPUT)
+    recorder.configure(magic.RECORD_OUTPUT)
+    pool.start(magic.DRAW_WORKERS)
+    if magic.SEARCH_WORKERS:
+        import search
+
+        search.start(magic.SEARCH_WORKERS)
     beginReadLine()
 
 if __name__ == "__main__":
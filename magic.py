@@ -1,4 +1,60 @@
+import json
+import os
+
 DRAW_LIM_CALCS = 1000000
+# Cards the draw subturn scores together between deadline checks.
+DRAW_BATCH_SIZE = 16
+# Cards the discard subturn evaluates for the opponent, from our least
+# valuable up. A count of 7 or more considers the whole hand, which ignores
+# our own ranking and loses more games than it wins against the default.
 DISCARD_CANDIDATE_COUNT = 3
-SCORING_LIM_CALCS = 400
-SCORING_SQUASH_SCALE_FACTOR = 0.5
+# Boards kept in the transposition table. An entry holds about 16 KB of path
+# tables for a 20-card board, so this is about 16 MB per process.
+SCORE_CACHE_SIZE = 1024
+# Score candidate placements in NumPy batches when NumPy is installed.
+BATCH_SCORING = True
+DRAW_WORKERS = 0
+# Wall-clock budget in seconds for each subturn: 0 and 1 draw, 2 place, 3 discard.
+MOVE_BUDGETS = {0: 1.0, 1: 1.0, 2: 1.0, 3: 1.0}
+# Per-message trace output: None (off), "stderr" or a JSONL file path.
+TRACE_OUTPUT = None
+# Record every message and response to this gzip log for replay.py (None: off).
+RECORD_OUTPUT = None
+# Precompute our next move's caches while the opponent moves.
+PONDER = False
+# Multi-turn Monte Carlo search for the place subturn (see search.py).
+SEARCH_PLACE = False
+SEARCH_WORKERS = 0
+SEARCH_CANDIDATES = 5
+SEARCH_ROLLOUT_TURNS = 4
+SEARCH_EXPLORATION = 2.0
+# Search time when the move has no deadline.
+SEARCH_SECONDS = 1.0
+
+
+def apply(overrides: dict) -> dict:
+    """
+    Sets the constants named in `overrides` and returns their old values,
+    so the caller can put them back.
+    """
+    previous = {}
+    for name, value in overrides.items():
+        if not name.isupper() or name not in globals():
+            raise KeyError(f"Unknown magic constant: {name}")
+        if name == "MOVE_BUDGETS":
+            # JSON object keys are strings; subturns are ints.
+            value = {int(sub_turn): budget for sub_turn, budget in value.items()}
+        previous[name] = globals()[name]
+        globals()[name] = value
+    return previous
+
+
+def load(path: str):
+    """Applies the overrides in a JSON file, such as one written by tune.py."""
+    with open(path) as file:
+        apply(json.load(file))
+
+
+# A config file named by MAGIC_CONFIG replaces the defaults above at startup.
+if os.environ.get("MAGIC_CONFIG"):
+    load(os.environ["MAGIC_CONFIG"])
@@ -1,44 +1,97 @@
-from utils import get_valid_play_coordinates, assess_card_placement
-import json
+from board import cell_coord
+from deadline import NO_DEADLINE, Deadline
+from protocol import send
+from session import GameSession
+import magic
 import sys
+import tracing
 
-# Global cache for card scores
-cached_card_scores = []
 
 def eprint(*args, **kwargs):
     """Prints to stderr."""
     print(*args, file=sys.stderr, **kwargs)
 
 
-def get_best_play(state: dict) -> tuple[tuple[str, int], tuple[int, int]]:
-    global cached_card_scores
-    coords = get_valid_play_coordinates(state["playArea"])
+def get_best_play(
+    state: dict, session: GameSession, deadline: Deadline = NO_DEADLINE
+) -> tuple[tuple[str, int], tuple[int, int]]:
+    """
+    Returns the (card, coord) placement with the highest value. Candidates
+    are evaluated highest upper bound first, and those whose bound cannot
+    beat the best placement found so far are skipped. Once the deadline
+    expires the best placement found so far is returned. Ties go to the
+    earlier card in hand, so the answer does not depend on the evaluation
+    order and matches an exhaustive search. With NumPy the cards in hand are
+    taken in the same order, by their highest bound, and each card's cells
+    that are not pruned are scored together in one batch, with the deadline
+    checked between batches.
+    """
+    table = session.placement_table(state)
+    cells = list(table.cells)
+    candidates = [(card, cell) for card in state["hand"] for cell in cells]
+    bounds = [table.bound(card, cell) for card, cell in candidates]
     best_score = 0
-    best_play = (state["hand"][0], list(coords)[0])
-    cached_card_scores = []  # Clear previous cache
-    
-    for card in state["hand"]:
-        card_best_score = 0
-        for coord in coords:
-            score = assess_card_placement(card, coord, state)
-            if score > card_best_score:
-                card_best_score = score
-            if score > best_score:
+    best_index = 0
+    pruned = 0
+
+    if table.batched():
+        width = len(cells)
+        starts = sorted(
+            range(0, len(candidates), width),
+            key=lambda start: -max(bounds[start : start + width]),
+        )
+        for start in starts:
+            live = [
+                index
+                for index in range(start, start + width)
+                if bounds[index] > best_score
+                or (bounds[index] == best_score and index < best_index)
+            ]
+            pruned += width - len(live)
+            if live:
+                values = table.batch_values([candidates[index] for index in live])
+                for index, score in zip(live, values):
+                    if score > best_score or (
+                        score == best_score and index < best_index
+                    ):
+                        best_score = score
+                        best_index = index
+            if deadline.expired():
+                break
+    else:
+        order = sorted(range(len(candidates)), key=lambda index: -bounds[index])
+        for index in order:
+            bound = bounds[index]
+            if bound < best_score or (bound == best_score and index > best_index):
+                pruned += 1
+                continue
+            score = table.value(*candidates[index])
+            if score > best_score or (score == best_score and index < best_index):
                 best_score = score
-                best_play = (card, coord)
-        # Cache the best score for this card
-        cached_card_scores.append((card, card_best_score))
+                best_index = index
+            if deadline.expired():
+                break
+
+    if tracing.enabled:
+        tracing.counters["placements_pruned"] += pruned
+    card, cell = candidates[best_index]
+    return card, cell_coord(cell)
 
-    return best_play
 
+def place(data: dict, session: GameSession, deadline: Deadline = NO_DEADLINE):
+    if magic.SEARCH_PLACE:
+        # Imported on first use, keeping the process pool machinery out of
+        # the start-up of a bot that does not search.
+        import search
 
-def place(data: dict):
-    card, coord = get_best_play(data["state"])
+        card, coord = search.best_play(data["state"], session, deadline)
+    else:
+        card, coord = get_best_play(data["state"], session, deadline)
     output = {
         "move": {"card": card, "coord": coord},
         "messageID": data["messageID"],
     }
-    print(json.dumps(output))
+    send(output)
 
 
 if __name__ == "__main__":
@@ -72,4 +125,4 @@ if __name__ == "__main__":
         "subTurn": 0,
         "previousTurn": {"move": ["R", 5], "metaData": False},
     }
-    get_best_play(test_state)
+    get_best_play(test_state, GameSession())
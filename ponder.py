@@ -0,0 +1,59 @@
+"""
+Pondering: while the opponent moves, a background thread fills the caches
+our next draw, place and discard will read: the placement table for our
+frontier (board scores and scoring probabilities for every card we might
+hold) and the opponent's placement table used by discard.
+
+The thread only runs between messages. beginReadLine stops it as soon as
+the next message is read, before handling it, so the handlers never share
+the caches with it; whatever it finished is simply found in the caches.
+"""
+
+import threading
+
+from session import GameSession
+
+
+_thread = None
+_cancel = None
+
+
+def start(state: dict, session: GameSession):
+    """
+    Starts pondering on `state` with the caches of `session`, cancelling any
+    earlier pondering.
+    """
+    global _thread, _cancel
+    stop()
+    _cancel = threading.Event()
+    _thread = threading.Thread(
+        target=_ponder, args=(state, session, _cancel), daemon=True
+    )
+    _thread.start()
+
+
+def stop():
+    """Cancels pondering and waits for the thread to reach a safe point."""
+    global _thread
+    if _thread is None:
+        return
+    _cancel.set()
+    _thread.join()
+    _thread = None
+
+
+def _ponder(state: dict, session: GameSession, cancel: threading.Event):
+    table = session.placement_table(state)
+    if cancel.is_set():
+        return
+    session.opponent_table(state)
+
+    # Cards we may hold next turn: our hand, the discard-pile tops, then
+    # anything we have not seen.
+    cards = list(state["hand"])
+    cards += [state[pile][-1] for pile in ["discard", "opponentDiscard"] if state[pile]]
+    cards += sorted(table.unknown_cards)
+    for card in cards:
+        if cancel.is_set():
+            return
+        table.best_value(card)
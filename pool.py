@@ -0,0 +1,158 @@
+"""
+Opt-in worker pool that spreads draw evaluations across cores.
+
+The pool is started once, at process start-up. Each time the state changes
+the parent writes it once into a shared buffer and bumps a generation
+number; tasks then only carry the generation and a chunk of cards. Each
+worker decodes a state once per generation and keeps its own placement
+table, so board scores also survive between subturns on the worker side.
+
+The buffer is written and read under a lock shared with the workers, so a
+worker never decodes a half-written state. Its header also numbers the
+calls to best_values(): tasks of an earlier call, left queued when its
+deadline expired, see a newer call number and return without working.
+"""
+
+import atexit
+import json
+import struct
+
+from deadline import NO_DEADLINE, Deadline
+from values import PlacementTable
+
+# Only these fields feed PlacementTable.update().
+STATE_FIELDS = [
+    "hand",
+    "opponentHand",
+    "discard",
+    "opponentDiscard",
+    "playArea",
+    "opponentPlayArea",
+]
+
+# generation, call, payload length
+_HEADER = struct.Struct("<QQI")
+_BUFFER_SIZE = 1 << 16
+
+_pool = None
+_buffer = None
+_lock = None
+_generation = 0
+_call = 0
+_published = None
+_workers = 0
+
+# Worker side
+_worker_buffer = None
+_worker_lock = None
+_worker_generation = -1
+_worker_table = PlacementTable()
+
+
+def start(workers: int):
+    """Starts `workers` worker processes; does nothing if `workers` is 0."""
+    global _pool, _buffer, _lock, _workers
+    if workers <= 0 or _pool is not None:
+        return
+    # Imported here: a bot without workers need not pay for it at start-up.
+    import multiprocessing
+
+    _buffer = multiprocessing.RawArray("B", _BUFFER_SIZE)
+    _lock = multiprocessing.Lock()
+    _pool = multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=(_buffer, _lock)
+    )
+    _workers = workers
+    atexit.register(stop)
+
+
+def stop():
+    """Shuts the pool down."""
+    global _pool, _buffer, _lock, _published, _workers
+    if _pool is None:
+        return
+    _pool.terminate()
+    _pool.join()
+    _pool = None
+    _buffer = None
+    _lock = None
+    _published = None
+    _workers = 0
+
+
+def running() -> bool:
+    return _pool is not None
+
+
+def _publish(state: dict) -> tuple[int, int]:
+    """
+    Starts a new call, cancelling the tasks left from earlier ones, and
+    writes the state to the shared buffer unless the workers have it.
+    Returns the generation and the call number.
+    """
+    global _generation, _call, _published
+    payload = json.dumps({field: state[field] for field in STATE_FIELDS}).encode()
+    if _HEADER.size + len(payload) > _BUFFER_SIZE:
+        raise ValueError("State too large for the worker buffer")
+    _call += 1
+    with _lock:
+        if payload != _published:
+            _generation += 1
+            _buffer[_HEADER.size : _HEADER.size + len(payload)] = payload
+            _published = payload
+        _HEADER.pack_into(_buffer, 0, _generation, _call, len(_published))
+    return _generation, _call
+
+
+def best_values(
+    state: dict, cards: list, deadline: Deadline = NO_DEADLINE
+) -> list[float]:
+    """
+    Returns PlacementTable.best_value() for each card, computed on the
+    workers. If the deadline expires first, returns the values for the
+    leading cards that finished.
+    """
+    import multiprocessing
+
+    generation, call = _publish(state)
+    # A few chunks per worker, so a deadline leaves little finished work unused.
+    chunk_size = max(1, -(-len(cards) // (_workers * 4)))
+    chunks = [
+        (generation, call, cards[start : start + chunk_size])
+        for start in range(0, len(cards), chunk_size)
+    ]
+    values = []
+    results = _pool.imap(_best_values, chunks)
+    for _ in chunks:
+        try:
+            chunk = results.next(timeout=deadline.remaining())
+        except multiprocessing.TimeoutError:
+            chunk = None
+        # Checked once per chunk, timed out or not, so that a replay stops
+        # after the same chunk (see recorder.deadline()).
+        if deadline.expired() or chunk is None:
+            break
+        values.extend(chunk)
+    return values
+
+
+def _init_worker(buffer, lock):
+    global _worker_buffer, _worker_lock
+    _worker_buffer = buffer
+    _worker_lock = lock
+
+
+def _best_values(task: tuple) -> list[float]:
+    global _worker_generation
+    generation, call, cards = task
+    with _worker_lock:
+        _, current_call, length = _HEADER.unpack_from(_worker_buffer, 0)
+        # Left over from a call whose deadline expired: nobody waits for it.
+        if call != current_call:
+            return []
+        if generation != _worker_generation:
+            payload = bytes(_worker_buffer[_HEADER.size : _HEADER.size + length])
+    if generation != _worker_generation:
+        _worker_table.update(json.loads(payload))
+        _worker_generation = generation
+    return _worker_table.best_values(cards)
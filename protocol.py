@@ -0,0 +1,66 @@
+"""
+The line-delimited JSON protocol spoken with the game server.
+
+Messages are read from stdin as bytes through a large buffer and decoded
+with orjson when it is installed, falling back to the standard library.
+Opponent-turn messages, which only need their messageID answered, can be
+recognised without decoding the state at all. Responses are encoded
+exactly as json.dumps does and written with one explicit flush.
+"""
+
+import json
+import re
+import sys
+
+import recorder
+import tracing
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+READ_BUFFER_SIZE = 1 << 20
+
+_OPPONENT_TURN = re.compile(rb'"activeTurn"\s*:\s*false\b')
+_GAME_MESSAGE = re.compile(rb'"message"\s*:')
+_MESSAGE_ID = re.compile(rb'"messageID"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+
+
+def read_lines():
+    """Yields raw message lines from stdin until it is closed."""
+    stdin = open(sys.stdin.fileno(), "rb", buffering=READ_BUFFER_SIZE, closefd=False)
+    yield from stdin
+
+
+def loads(line):
+    """Decodes a JSON document from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def decode(line, full: bool = True) -> dict:
+    """
+    Decodes a message line. Unless `full` is set, an opponent-turn message is
+    decoded only as far as its messageID, since that is all its answer needs.
+    """
+    if not full and _OPPONENT_TURN.search(line) and not _GAME_MESSAGE.search(line):
+        message_id = _MESSAGE_ID.search(line)
+        if message_id is not None:
+            return {
+                "messageID": loads(message_id.group(1)),
+                "state": {"activeTurn": False},
+            }
+    return loads(line)
+
+
+def send(output: dict):
+    """Writes a response to the game server."""
+    tracing.mark("evaluate")
+    stdout = sys.stdout
+    stdout.write(json.dumps(output) + "\n")
+    stdout.flush()
+    tracing.mark("output")
+    if recorder.enabled:
+        recorder.respond(output)
@@ -1,9 +1,16 @@
 import json
 import sys
 
-from draw import draw
-from place import place, get_best_play
+from draw import assess_draw, draw
+from place import get_best_play, place
 from discard import get_discard_card
+from deadline import Deadline
+from protocol import decode, read_lines, send
+from session import GameSession
+import magic
+import ponder
+import recorder
+import tracing
 
 
 
@@ -13,73 +20,130 @@ def eprint(*args, **kwargs):
 
 
 def beginReadLine():
-    while True:
-        console_input = input()
-        try:
-            data = json.loads(console_input)
-            match data["state"].get("message"):
-                case "NEWGAME" | "ENDGAME":
-                    startEndGame(data)
-                case None:
-                    randomIsh(data)
-        except json.JSONDecodeError as e:
-            eprint(f"Invalid JSON: {e}")
+    session = GameSession()
+    for console_input in read_lines():
+        session = handle_line(console_input, session)
         # except Exception as e:
         #     eprint(f"Exception: {e}")
 
 
+def handle_line(console_input, session: GameSession) -> GameSession:
+    """
+    Answers one message line of a game. Returns the session to use for the
+    game's next message, which is a new one after NEWGAME.
+    """
+    ponder.stop()
+    tracing.begin()
+    recorder.begin()
+    data = None
+    try:
+        # Pondering needs the whole state of opponent-turn messages.
+        data = decode(console_input, full=magic.PONDER)
+        tracing.mark("parse")
+        match data["state"].get("message"):
+            case "NEWGAME":
+                session = GameSession()
+                startEndGame(data)
+            case "ENDGAME":
+                session.clear()
+                startEndGame(data)
+            case None:
+                randomIsh(data, session)
+    except json.JSONDecodeError as e:
+        eprint(f"Invalid JSON: {e}")
+    tracing.finish(data)
+    recorder.finish(console_input)
+    if magic.PONDER and is_opponent_turn(data):
+        ponder.start(data["state"], session)
+    return session
+
+
+def is_opponent_turn(data: dict) -> bool:
+    """Whether `data` is a game message sent while the opponent moves."""
+    if data is None or data["state"].get("message") is not None:
+        return False
+    return data["state"].get("activeTurn") is False
+
+
 def startEndGame(data: dict):
     output = {"move": 0, "messageID": data["messageID"]}
-    print(json.dumps(output))
+    send(output)
+    if data["state"].get("message") == "NEWGAME":
+        warm_up()
 
 
-def discard(data: dict):
+# A small early-game position that takes every handler through its hot paths.
+WARM_UP_STATE = {
+    "deck": 28,
+    "hand": [["J", 1], ["R", 3], ["C", 4], ["M", 5], ["O", 6], ["W", 8], ["J", 7]],
+    "discard": [["R", 2]],
+    "opponentDiscard": [["C", 6]],
+    "playArea": {"0": {"0": ["J", 4], "1": ["M", 2]}},
+    "opponentPlayArea": {"0": {"0": ["O", 3], "-1": ["W", 5]}},
+    "opponentHand": [None, None, None, None, None, None, ["C", 7]],
+    "turn": 5,
+    "subTurn": 0,
+    "activeTurn": True,
+    "previousTurn": {"move": False, "metaData": False},
+}
+
+
+def warm_up():
+    """
+    Runs a draw, place and discard evaluation on WARM_UP_STATE with a
+    throwaway session once NEWGAME is answered, so that the first real move
+    finds the interpreter, allocator and shared caches as warm as later ones.
+    """
+    session = GameSession()
+    assess_draw(WARM_UP_STATE, session)
+    get_best_play(WARM_UP_STATE, session)
+    get_discard_card(WARM_UP_STATE, session)
+
+
+def discard(data: dict, session: GameSession, deadline: Deadline):
     """
     Handles discard phase (subTurn 3) using our discard heuristic.
     
     Args:
         data: Game data with messageID and state (same format as place())
+        session: GameSession of the game
+        deadline: Deadline for the move
     """
     try:
-        # Check if we have cached card scores from placement phase
-        from place import cached_card_scores
-        if not cached_card_scores:
-            # Cache not populated, need to run placement analysis first
-            eprint("Cache empty, running placement analysis for discard decision")
-            get_best_play(data["state"])
-        
         # Get discard recommendation using our heuristic
-        discard_card = get_discard_card(data["state"])
+        discard_card = get_discard_card(data["state"], session, deadline=deadline)
         
         # Format response for game engine
         output = {
             "move": discard_card,
             "messageID": data["messageID"]
         }
-        print(json.dumps(output))
+        send(output)
         
     except Exception as e:
         eprint(f"Error in discard logic: {e}")
         # Fallback to random discard
         output = {"move": "RANDOM", "messageID": data["messageID"]}
-        print(json.dumps(output))
+        send(output)
 
 
-def randomIsh(data: dict):
+def randomIsh(data: dict, session: GameSession):
 
     if not data["state"]["activeTurn"]:
         output = {"move": "RANDOM", "messageID": data["messageID"]}
-        print(json.dumps(output))
+        send(output)
     else:
-        match data["state"]["subTurn"]:
+        sub_turn = data["state"]["subTurn"]
+        deadline = recorder.deadline(magic.MOVE_BUDGETS.get(sub_turn))
+        match sub_turn:
             case 0 | 1:
-                draw(data)
+                draw(data, session, deadline)
      
             case 2:
-                 place(data)
+                 place(data, session, deadline)
             case 3:
-                discard(data)
+                discard(data, session, deadline)
             case _:
                 output = {"move": "RANDOM", "messageID": data["messageID"]}
-                print(json.dumps(output))
+                send(output)
 
@@ -0,0 +1,117 @@
+"""
+Opt-in recording of the messages readLine.beginReadLine handles. When
+enabled, every inbound message line is appended to a gzip log together with
+the responses sent, the time taken, the random seed the message was
+handled with and how far its move got before the deadline, so replay.py
+can play a real game back exactly, on any machine. When disabled, the hot
+path only pays for an `if recorder.enabled` check.
+
+Each record is one JSON line; the log is flushed after every record, so it
+stays readable if the bot is killed mid-game.
+"""
+
+import gzip
+import json
+import random
+from time import perf_counter, time
+
+from deadline import Deadline
+
+enabled = False
+
+_output = None
+_start = 0.0
+_seed = None
+_responses = []
+_deadline = None
+_notes = {}
+# The record being replayed, if any.
+_replayed = None
+
+
+def configure(path: str = None):
+    """Appends records to the gzip file `path`; None turns recording off."""
+    global enabled, _output
+    if _output is not None:
+        _output.close()
+    enabled = path is not None
+    _output = gzip.open(path, "at") if enabled else None
+
+
+def begin():
+    """
+    Starts recording a message that has just been read, and reseeds the
+    random module so that its sampling can be repeated on replay.
+    """
+    global _start, _seed, _deadline
+    if not enabled:
+        return
+    _seed = random.getrandbits(32)
+    random.seed(_seed)
+    _responses.clear()
+    _deadline = None
+    _notes.clear()
+    _start = perf_counter()
+
+
+def deadline(seconds: float) -> Deadline:
+    """
+    The deadline for a move with a budget of `seconds`. While a record is
+    replayed it expires at the same check the recorded move's did, or never
+    if that one did not, so the replay does the same work as the move.
+    """
+    global _deadline
+    if _replayed is not None:
+        return Deadline(checks=_replayed.get("checks"))
+    _deadline = Deadline(seconds)
+    return _deadline
+
+
+def note(name: str, value):
+    """Keeps `value` in the current record, for recorded() on replay."""
+    if enabled:
+        _notes[name] = value
+
+
+def recorded(name: str):
+    """The value noted as `name` in the record being replayed, if any."""
+    if _replayed is None:
+        return None
+    return _replayed.get("notes", {}).get(name)
+
+
+def replaying(record: dict = None):
+    """Makes deadline() and recorded() follow `record`, or stops them."""
+    global _replayed
+    _replayed = record
+
+
+def respond(output: dict):
+    """Notes a response sent for the current message."""
+    if enabled:
+        _responses.append(output)
+
+
+def finish(line):
+    """Writes the record for the current message line."""
+    if not enabled:
+        return
+    ran_out = _deadline is not None and _deadline.ran_out
+    record = {
+        "time": time(),
+        "seconds": perf_counter() - _start,
+        "seed": _seed,
+        "message": (line.decode() if isinstance(line, bytes) else line).rstrip("\n"),
+        "responses": list(_responses),
+        "checks": _deadline.checks if ran_out else None,
+        "notes": dict(_notes),
+    }
+    _output.write(json.dumps(record) + "\n")
+    _output.flush()
+
+
+def read(path: str):
+    """Yields the records of a log."""
+    with gzip.open(path, "rt") as file:
+        for line in file:
+            yield json.loads(line)
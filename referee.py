@@ -0,0 +1,290 @@
+"""
+A headless Arboretum referee for self-play.
+
+Deals a shuffled deck of scoring.ALL_CARDS, seven cards each, and drives two
+in-process bots through the same message lines the game server sends:
+every subturn goes to both players, the inactive one answering as it would
+on the opponent's turn. Each bot has its own GameSession. The game ends
+after the turn that empties the deck and is scored with the hand-majority
+rule (scoring.final_scores). Games run in parallel across processes:
+
+    python referee.py --games 200 --processes 8
+"""
+
+import argparse
+import functools
+import io
+import json
+import os
+import random
+import sys
+from contextlib import redirect_stdout
+from multiprocessing import Pool
+from time import perf_counter
+
+import magic
+from board import Board
+from protocol import loads
+from readLine import handle_line
+from scoring import ALL_CARDS, final_scores
+from session import GameSession
+from utils import get_valid_play_coordinates
+
+HAND_SIZE = 7
+# The move made on each subturn, which names the Game method applying it.
+SUB_TURNS = ["draw", "draw", "place", "discard"]
+MOVES = ["draw", "place", "discard"]
+
+
+def eprint(*args, **kwargs):
+    """Prints to stderr."""
+    print(*args, file=sys.stderr, **kwargs)
+
+
+class Bot:
+    """
+    One player: a GameSession answering message lines through readLine,
+    with the magic constants in `config` overridden while it answers.
+    """
+
+    def __init__(self, config: dict = None):
+        self.session = GameSession()
+        self.config = config or {}
+
+    def ask(self, message: dict):
+        """Sends a message line and returns the move answered, if any."""
+        output = io.StringIO()
+        previous = magic.apply(self.config)
+        try:
+            with redirect_stdout(output):
+                self.session = handle_line(json.dumps(message).encode(), self.session)
+        finally:
+            magic.apply(previous)
+        answer = output.getvalue()
+        return loads(answer)["move"] if answer else None
+
+
+class Game:
+    """The true state of one game between players 0 and 1."""
+
+    def __init__(self, rng: random.Random):
+        deck = [list(card) for card in sorted(ALL_CARDS)]
+        rng.shuffle(deck)
+        self.rng = rng
+        self.hands = [deck[:HAND_SIZE], deck[HAND_SIZE : 2 * HAND_SIZE]]
+        self.deck = deck[2 * HAND_SIZE :]
+        self.discards = [[], []]
+        self.play_areas = [{}, {}]
+        # Cards each player took from a discard pile, which the other has seen.
+        self.revealed = [[], []]
+        self.turn = 0
+        self.previous_move = False
+        self.illegal_moves = 0
+
+    def state(self, player: int, active: int, sub_turn: int) -> dict:
+        """The game as `player` sees it."""
+        other = 1 - player
+        opponent_hand = [
+            card if card in self.revealed[other] else None for card in self.hands[other]
+        ]
+        return {
+            "deck": len(self.deck),
+            "hand": self.hands[player],
+            "discard": self.discards[player],
+            "opponentDiscard": self.discards[other],
+            "playArea": self.play_areas[player],
+            "opponentPlayArea": self.play_areas[other],
+            "opponentHand": opponent_hand,
+            "turn": self.turn,
+            "subTurn": sub_turn,
+            "activeTurn": player == active,
+            "previousTurn": {"move": self.previous_move, "metaData": False},
+        }
+
+    def draw(self, player: int, move):
+        piles = [self.deck, self.discards[player], self.discards[1 - player]]
+        if move not in (0, 1, 2) or not piles[move]:
+            if move != "RANDOM":
+                self.illegal_moves += 1
+            move = self.rng.choice([index for index, pile in enumerate(piles) if pile])
+        card = piles[move].pop()
+        if move != 0:
+            self.revealed[player].append(card)
+        self.hands[player].append(card)
+        return move
+
+    def place(self, player: int, move):
+        hand = self.hands[player]
+        play_area = self.play_areas[player]
+        cells = get_valid_play_coordinates(play_area)
+        legal = (
+            isinstance(move, dict)
+            and move.get("card") in hand
+            and tuple(move.get("coord", ())) in cells
+        )
+        if not legal:
+            if move != "RANDOM":
+                self.illegal_moves += 1
+            move = {
+                "card": self.rng.choice(hand),
+                "coord": list(self.rng.choice(sorted(cells))),
+            }
+        card = move["card"]
+        hand.remove(card)
+        self._forget(player, card)
+        x, y = move["coord"]
+        play_area.setdefault(str(x), {})[str(y)] = card
+        return move
+
+    def discard(self, player: int, move):
+        hand = self.hands[player]
+        if move not in hand:
+            if move != "RANDOM":
+                self.illegal_moves += 1
+            move = self.rng.choice(hand)
+        hand.remove(move)
+        self._forget(player, move)
+        self.discards[player].append(move)
+        return move
+
+    def _forget(self, player: int, card):
+        if card in self.revealed[player]:
+            self.revealed[player].remove(card)
+
+    def scores(self) -> list:
+        boards = [Board.from_play_area(play_area) for play_area in self.play_areas]
+        return final_scores(boards, self.hands)
+
+
+def play_game(seed: int, configs: tuple = (None, None)) -> dict:
+    """
+    Plays one game, player seed % 2 moving first, each player with the
+    magic overrides in `configs`. Returns the final scores and the time each
+    player took to answer each subturn.
+    """
+    rng = random.Random(seed)
+    # The bots sample unknown cards with the module-level generator.
+    random.seed(seed)
+    game = Game(rng)
+    bots = [Bot(config) for config in configs]
+    latencies = [{name: [] for name in MOVES} for _ in bots]
+    message_ids = iter(range(1 << 30))
+
+    for bot in bots:
+        bot.ask({"messageID": next(message_ids), "state": {"message": "NEWGAME"}})
+
+    active = seed % 2
+    while True:
+        game.turn += 1
+        for sub_turn, name in enumerate(SUB_TURNS):
+            if name == "draw" and not (game.deck or any(game.discards)):
+                continue
+            move = None
+            for player in (1 - active, active):
+                message = {
+                    "messageID": next(message_ids),
+                    "state": game.state(player, active, sub_turn),
+                }
+                start = perf_counter()
+                answer = bots[player].ask(message)
+                if player == active:
+                    latencies[player][name].append(perf_counter() - start)
+                    move = answer
+            game.previous_move = getattr(game, name)(active, move)
+        if not game.deck:
+            break
+        active = 1 - active
+
+    for bot in bots:
+        bot.ask({"messageID": next(message_ids), "state": {"message": "ENDGAME"}})
+    return {
+        "seed": seed,
+        "scores": game.scores(),
+        "turns": game.turn,
+        "illegalMoves": game.illegal_moves,
+        "latencies": latencies,
+    }
+
+
+def percentile(samples: list, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def report(results: list, seconds: float):
+    wins = [0, 0]
+    draws = 0
+    for result in results:
+        first, second = result["scores"]
+        if first == second:
+            draws += 1
+        else:
+            wins[0 if first > second else 1] += 1
+    games = len(results)
+    print(f"{games} games in {seconds:.1f}s: {games / seconds:.2f} games/sec")
+    print(
+        f"wins: player 0 {wins[0] / games:.1%}, player 1 {wins[1] / games:.1%},"
+        f" draws {draws / games:.1%}"
+    )
+    illegal = sum(result["illegalMoves"] for result in results)
+    if illegal:
+        print(f"illegal moves replaced at random: {illegal}")
+    print(
+        f"{'player/move':<20}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}"
+        f"{'moves':>8}"
+    )
+    for player in (0, 1):
+        for name in MOVES:
+            samples = [
+                latency
+                for result in results
+                for latency in result["latencies"][player][name]
+            ]
+            if samples:
+                print(
+                    f"{f'{player}/{name}':<20}"
+                    f"{percentile(samples, 0.5) * 1000:>10.3f}"
+                    f"{percentile(samples, 0.95) * 1000:>10.3f}"
+                    f"{max(samples) * 1000:>10.3f}"
+                    f"{len(samples):>8}"
+                )
+
+
+def _read_config(path: str) -> dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write every game's result to this JSON file")
+    parser.add_argument(
+        "--configs",
+        nargs=2,
+        metavar=("PLAYER0", "PLAYER1"),
+        help="JSON files of magic overrides for each player",
+    )
+    args = parser.parse_args()
+
+    configs = (None, None)
+    if args.configs:
+        configs = tuple(_read_config(path) for path in args.configs)
+
+    seeds = range(args.seed, args.seed + args.games)
+    start = perf_counter()
+    with Pool(args.processes) as pool:
+        game = functools.partial(play_game, configs=configs)
+        results = list(pool.imap_unordered(game, seeds))
+    seconds = perf_counter() - start
+
+    report(results, seconds)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(sorted(results, key=lambda result: result["seed"]), file)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Replays a log written by recorder.py as fast as it can.
+
+Every recorded message is handled again through readLine, with the random
+seed it was first handled with and the deadline stopping it where it
+stopped the recorded move, and the responses are checked against the
+recorded ones. Prints each message's recorded and replayed latency and
+whether the decision matched, then a summary; exits with status 1 if any
+decision differs, so recorded games can serve as regression inputs:
+
+    python replay.py game.log.gz
+    python replay.py --only-diffs game.log.gz
+"""
+
+import argparse
+import io
+import json
+import random
+import sys
+from contextlib import redirect_stdout
+from time import perf_counter
+
+import magic
+import pool
+import recorder
+from readLine import handle_line
+from session import GameSession
+
+
+def replay(path: str):
+    """Yields (record, replayed responses, replayed seconds) for a log."""
+    # Pondering cannot change a decision, so replays skip it.
+    previous = magic.apply({"PONDER": False})
+    # Draws on the pool check the deadline once per chunk, and the chunks
+    # depend on the number of workers, so those are replayed on a pool too.
+    pool.start(magic.DRAW_WORKERS)
+    try:
+        session = GameSession()
+        for record in recorder.read(path):
+            random.seed(record["seed"])
+            output = io.StringIO()
+            start = perf_counter()
+            recorder.replaying(record)
+            try:
+                with redirect_stdout(output):
+                    session = handle_line(record["message"].encode(), session)
+            finally:
+                recorder.replaying(None)
+            seconds = perf_counter() - start
+            lines = output.getvalue().splitlines()
+            yield record, [json.loads(line) for line in lines], seconds
+    finally:
+        magic.apply(previous)
+
+
+def describe(message: str) -> str:
+    data = json.loads(message)
+    state = data.get("state", {})
+    if state.get("message"):
+        return state["message"]
+    side = "ours" if state.get("activeTurn") else "theirs"
+    return f"turn {state.get('turn')} sub {state.get('subTurn')} {side}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument(
+        "--only-diffs", action="store_true", help="print only differing decisions"
+    )
+    args = parser.parse_args()
+
+    messages = mismatches = 0
+    recorded_total = replayed_total = 0.0
+    print(f"{'message':<28}{'recorded ms':>12}{'replay ms':>12}{'diff ms':>10}")
+    for path in args.logs:
+        for record, responses, seconds in replay(path):
+            messages += 1
+            matched = responses == record["responses"]
+            mismatches += not matched
+            recorded_total += record["seconds"]
+            replayed_total += seconds
+            if matched and args.only_diffs:
+                continue
+            print(
+                f"{describe(record['message']):<28}"
+                f"{record['seconds'] * 1000:>12.3f}"
+                f"{seconds * 1000:>12.3f}"
+                f"{(seconds - record['seconds']) * 1000:>+10.3f}"
+                f"  {'ok' if matched else 'DIFF'}"
+            )
+            if not matched:
+                print(f"    recorded: {json.dumps(record['responses'])}")
+                print(f"    replayed: {json.dumps(responses)}")
+
+    print(
+        f"{messages} messages, {mismatches} decisions differ;"
+        f" recorded {recorded_total:.3f}s, replayed {replayed_total:.3f}s"
+    )
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
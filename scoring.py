@@ -1,8 +1,22 @@
-from typing import Dict, List, Tuple
-from collections import defaultdict
-from itertools import combinations
+from typing import Dict, FrozenSet, List, Tuple
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
 import sys
 
+import magic
+import tracing
+
+from board import (
+    CARD_RANK,
+    CARD_SPECIES,
+    EMPTY,
+    NEIGHBOUR_OFFSETS,
+    SPECIES,
+    SPECIES_INDEX,
+    Board,
+)
+from tables import binomial, rank_tail
+
 
 def eprint(*args, **kwargs):
     """Prints to stderr."""
@@ -17,10 +31,12 @@ Coord = Tuple[int, int]
 PlayArea = Dict[str, Dict[str, Card]]
 Path = List[Card]
 
+ALL_SPECIES = SPECIES
+
 ALL_CARDS = set(
     [
         (species, num)
-        for species in ["J", "R", "C", "M", "O", "W"]
+        for species in ALL_SPECIES
         for num in range(1, 9)
     ]
 )
@@ -74,6 +90,8 @@ def get_score_from_starting_card(
 
     while search_track_stack:
         current_track = search_track_stack.pop()
+        if tracing.enabled:
+            tracing.counters["dfs_nodes_expanded"] += 1
         path = current_track["path"]
         coord = current_track["coord"]
         visited_cards = current_track["visited_cards"]
@@ -140,10 +158,10 @@ def get_all_cards_of_species(
     return cards_of_species
 
 
-def score_play_area(play_area: PlayArea, species: Species) -> int:
+def score_play_area_dfs(play_area: PlayArea, species: Species) -> int:
     """
-    Calculates the total score for a given species by checking all possible
-    starting cards of that species.
+    Reference scorer: exhaustively searches every path from every starting
+    card of the species. Exponential on dense boards, kept for testing.
     """
     highest_score = 0
     starting_cards = get_all_cards_of_species(play_area, species)
@@ -157,6 +175,509 @@ def score_play_area(play_area: PlayArea, species: Species) -> int:
     return highest_score
 
 
+def _forward_tables(board: Board):
+    """
+    Longest-path dynamic program over the rank DAG, for every species in one
+    walk. Paths strictly increase in rank, so visiting cards in rank order
+    means every predecessor of a card is final before the card is reached.
+
+    For each occupied cell we keep:
+      reach: per start species, the best (path length + start bonus) over
+             paths that begin on a card of that species and end here, or -1
+             if there are none.
+      mono:  indexed by path length, the best start bonus over paths of only
+             the cell's own species that end here, or -1.
+
+    A path scores for a species when it also ends on that species, so each
+    card reads its own species' entry of reach. Returns the highest path
+    score of each species, in species order, along with both tables.
+    """
+    grid = board.grid
+    reach_by_cell = {}
+    mono_by_cell = {}
+    highest_scores = [0] * len(ALL_SPECIES)
+    if tracing.enabled:
+        tracing.counters["dp_nodes_expanded"] += board.count
+
+    for cell in sorted(board.cells(), key=lambda c: CARD_RANK[grid[c]]):
+        card = grid[cell]
+        rank = CARD_RANK[card]
+        species = CARD_SPECIES[card]
+        reach = None
+        mono = [-1] * 9
+
+        for offset in NEIGHBOUR_OFFSETS:
+            prev_cell = cell + offset
+            prev_card = grid[prev_cell]
+            if prev_card == EMPTY or CARD_RANK[prev_card] >= rank:
+                continue
+            prev_reach = reach_by_cell[prev_cell]
+            if reach is None:
+                reach = list(prev_reach)
+            else:
+                reach = [a if a > b else b for a, b in zip(reach, prev_reach)]
+            if CARD_SPECIES[prev_card] == species:
+                prev_mono = mono_by_cell[prev_cell]
+                for length in range(1, 8):
+                    if prev_mono[length] > mono[length + 1]:
+                        mono[length + 1] = prev_mono[length]
+
+        if reach is None:
+            reach = [-1] * len(ALL_SPECIES)
+        else:
+            reach = [r + 1 if r >= 0 else -1 for r in reach]
+
+        end_bonus = 2 if rank == 8 else 0
+        highest_score = highest_scores[species]
+        # Paths of two or more cards ending on this card.
+        if reach[species] >= 0 and reach[species] + end_bonus > highest_score:
+            highest_score = reach[species] + end_bonus
+        # Monospecies paths of four or more cards score double length.
+        for length in range(4, 9):
+            if mono[length] >= 0:
+                score = 2 * length + mono[length] + end_bonus
+                if score > highest_score:
+                    highest_score = score
+        highest_scores[species] = highest_score
+
+        start_bonus = 1 if rank == 1 else 0
+        if 1 + start_bonus > reach[species]:
+            reach[species] = 1 + start_bonus
+        mono[1] = start_bonus
+        reach_by_cell[cell] = reach
+        mono_by_cell[cell] = mono
+
+    return highest_scores, reach_by_cell, mono_by_cell
+
+
+def _backward_tables(board: Board):
+    """
+    Mirror of _forward_tables: visits cards in descending rank and keeps, per
+    cell, the best (path length + end bonus) over paths that start here and
+    end on a card of each species, and for the cell's own species the best
+    end bonus per monospecies path length.
+    """
+    grid = board.grid
+    back_by_cell = {}
+    mono_by_cell = {}
+    if tracing.enabled:
+        tracing.counters["dp_nodes_expanded"] += board.count
+
+    for cell in sorted(board.cells(), key=lambda c: -CARD_RANK[grid[c]]):
+        card = grid[cell]
+        rank = CARD_RANK[card]
+        species = CARD_SPECIES[card]
+        back = None
+        mono = [-1] * 9
+
+        for offset in NEIGHBOUR_OFFSETS:
+            next_cell = cell + offset
+            next_card = grid[next_cell]
+            if next_card == EMPTY or CARD_RANK[next_card] <= rank:
+                continue
+            next_back = back_by_cell[next_cell]
+            if back is None:
+                back = list(next_back)
+            else:
+                back = [a if a > b else b for a, b in zip(back, next_back)]
+            if CARD_SPECIES[next_card] == species:
+                next_mono = mono_by_cell[next_cell]
+                for length in range(1, 8):
+                    if next_mono[length] > mono[length + 1]:
+                        mono[length + 1] = next_mono[length]
+
+        if back is None:
+            back = [-1] * len(ALL_SPECIES)
+        else:
+            back = [b + 1 if b >= 0 else -1 for b in back]
+
+        end_bonus = 2 if rank == 8 else 0
+        if 1 + end_bonus > back[species]:
+            back[species] = 1 + end_bonus
+        mono[1] = end_bonus
+        back_by_cell[cell] = back
+        mono_by_cell[cell] = mono
+
+    return back_by_cell, mono_by_cell
+
+
+ScoreCacheInfo = namedtuple(
+    "ScoreCacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+
+class ScoreCache:
+    """
+    Bounded LRU transposition table of scored boards, keyed by
+    Board.layout_key() so translated copies of a board share one entry.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry
+
+    def store(self, key, entry):
+        if self.maxsize <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def resize(self, maxsize: int):
+        """Changes the number of boards kept, evicting the oldest if needed."""
+        self.maxsize = maxsize
+        while len(self.entries) > max(maxsize, 0):
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> ScoreCacheInfo:
+        return ScoreCacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+
+score_cache = ScoreCache(magic.SCORE_CACHE_SIZE)
+
+
+def board_scores(board: Board, use_cache: bool = True) -> Dict[Species, int]:
+    """
+    Calculates the score of every species on a board. Pass use_cache=False
+    for throwaway boards, such as those of a playout, to keep them out of the
+    transposition table.
+    """
+    if not use_cache:
+        return _score_species(board)
+    return dict(score_board(board).scores)
+
+
+def _score_species(board: Board) -> Dict[Species, int]:
+    return dict(zip(ALL_SPECIES, _forward_tables(board)[0]))
+
+
+class ScoredBoard:
+    """
+    A board together with its per-species scores and the forward and
+    backward path tables needed to rescore it after a single placement.
+    reach and back map each occupied cell to its entries per species, in
+    species order; mono_reach and mono_back map it to the monospecies
+    entries of its own species. best_reach and best_back hold the highest
+    entry of each species, or -1 if no path starts or ends on it.
+
+    Scores only need the forward tables, so the backward ones are built the
+    first time they are read.
+    """
+
+    def __init__(self, board: Board):
+        self.board = board
+        scores, self.reach, self.mono_reach = _forward_tables(board)
+        self.scores = dict(zip(ALL_SPECIES, scores))
+        self.best_reach = _best_entries(self.reach)
+        self._backward = None
+        # The transposition table entry these tables belong to, if any, and
+        # how far this board sits from the board the entry is keyed by.
+        self._layout = None
+        self._offset = 0
+
+    @property
+    def back(self) -> Dict[int, List[int]]:
+        return self._backward_tables()[0]
+
+    @property
+    def mono_back(self) -> Dict[int, List[int]]:
+        return self._backward_tables()[1]
+
+    @property
+    def best_back(self) -> List[int]:
+        return self._backward_tables()[2]
+
+    def _backward_tables(self) -> tuple:
+        if self._backward is None:
+            back, mono_back = _backward_tables(self.board)
+            self._backward = (back, mono_back, _best_entries(back))
+            layout = self._layout
+            if layout is not None and layout.backward is None:
+                layout.backward = _moved_backward(self._backward, -self._offset)
+        return self._backward
+
+
+class ScoredLayout:
+    """
+    A transposition table entry: the tables of a ScoredBoard, keyed by the
+    cells of the board they were built for, whose bounding box corner is
+    `corner`, but without the board itself. Backward tables built for any
+    board scored from the entry are written back to it.
+    """
+
+    __slots__ = ("corner", "scores", "reach", "mono_reach", "best_reach", "backward")
+
+    def __init__(self, scored: ScoredBoard, corner: int):
+        self.corner = corner
+        self.scores = scored.scores
+        self.reach = scored.reach
+        self.mono_reach = scored.mono_reach
+        self.best_reach = scored.best_reach
+        self.backward = scored._backward
+        scored._layout = self
+        scored._offset = 0
+
+    def scored(self, board: Board, corner: int) -> ScoredBoard:
+        """
+        The tables for `board`, which holds this layout with its corner on
+        `corner`. The entries themselves are shared, never changed.
+        """
+        offset = corner - self.corner
+        scored = ScoredBoard.__new__(ScoredBoard)
+        scored.board = board
+        scored.scores = self.scores
+        scored.reach = _moved(self.reach, offset)
+        scored.mono_reach = _moved(self.mono_reach, offset)
+        scored.best_reach = self.best_reach
+        scored._backward = None
+        if self.backward is not None:
+            scored._backward = _moved_backward(self.backward, offset)
+        scored._layout = self
+        scored._offset = offset
+        return scored
+
+
+def _best_entries(table: Dict[int, List[int]]) -> List[int]:
+    best = [max(entries, default=-1) for entries in zip(*table.values())]
+    return best or [-1] * len(ALL_SPECIES)
+
+
+def _moved(table: dict, offset: int) -> dict:
+    if offset == 0:
+        return table
+    return {cell + offset: entries for cell, entries in table.items()}
+
+
+def _moved_backward(backward: tuple, offset: int) -> tuple:
+    back, mono_back, best_back = backward
+    return _moved(back, offset), _moved(mono_back, offset), best_back
+
+
+def score_board(board: Board, use_cache: bool = True) -> ScoredBoard:
+    """
+    Scores a board and keeps the tables used by score_placement. Boards are
+    looked up in the transposition table by layout, so the tables of a
+    board seen before, possibly elsewhere on the grid, are reused, moved to
+    this board's cells.
+    """
+    if not use_cache:
+        return ScoredBoard(board)
+    key, corner = board.layout()
+    layout = score_cache.lookup(key)
+    if tracing.enabled:
+        hit = layout is not None
+        tracing.counters["score_cache_hits" if hit else "boards_scored"] += 1
+    if layout is None:
+        scored = ScoredBoard(board)
+        score_cache.store(key, ScoredLayout(scored, corner))
+        return scored
+    return layout.scored(board, corner)
+
+
+def score_placement(scored: ScoredBoard, card: int, cell: int) -> Dict[Species, int]:
+    """
+    Returns the per-species scores of the scored board with the card id
+    `card` placed on the empty cell `cell`. Placing a card only adds paths,
+    and every new path passes through the new card, so each species score is
+    the old score or the best path through `cell`, whichever is higher.
+    """
+    return score_placements(scored, [card], cell)[0]
+
+
+# The best a path can score: all eight ranks of one species, from the 1 to the 8.
+MAX_PATH_SCORE = 2 * 8 + 1 + 2
+
+
+def score_bounds(scored: ScoredBoard, card: int, cell: int) -> List[int]:
+    """
+    Upper bounds on the per-species scores score_placement() would return,
+    in species order, from the card's neighbours alone: a new path joins the
+    best path into any cell to the card and the best path out of any cell,
+    and only the card's own species can gain a monospecies path.
+    """
+    grid = scored.board.grid
+    rank = CARD_RANK[card]
+    card_species = CARD_SPECIES[card]
+    has_below = has_above = has_same = False
+    for offset in NEIGHBOUR_OFFSETS:
+        neighbour_card = grid[cell + offset]
+        if neighbour_card == EMPTY or CARD_RANK[neighbour_card] == rank:
+            continue
+        if CARD_RANK[neighbour_card] < rank:
+            has_below = True
+        else:
+            has_above = True
+        if CARD_SPECIES[neighbour_card] == card_species:
+            has_same = True
+
+    bounds = []
+    for index, species in enumerate(ALL_SPECIES):
+        bound = scored.scores[species]
+        best_reach = scored.best_reach[index]
+        best_back = scored.best_back[index]
+        if has_below and has_above and best_reach >= 0 and best_back >= 0:
+            bound = max(bound, best_reach + 1 + best_back)
+        if index == card_species:
+            if has_below and best_reach >= 0:
+                bound = max(bound, best_reach + 1 + (2 if rank == 8 else 0))
+            if has_above and best_back >= 0:
+                bound = max(bound, (1 if rank == 1 else 0) + 1 + best_back)
+            if has_same:
+                bound = max(bound, MAX_PATH_SCORE)
+        bounds.append(bound)
+    return bounds
+
+
+def score_placements(
+    scored: ScoredBoard, cards: List[int], cell: int
+) -> List[Dict[Species, int]]:
+    """
+    score_placement() for each of several card ids on the same cell. The
+    neighbours are read once, and the paths the card only joins together
+    depend on its rank alone, so cards of the same rank share them.
+    """
+    if tracing.enabled:
+        tracing.counters["placements_scored"] += len(cards)
+    grid = scored.board.grid
+    neighbours = [
+        (cell + offset, grid[cell + offset])
+        for offset in NEIGHBOUR_OFFSETS
+        if grid[cell + offset] != EMPTY
+    ]
+
+    by_rank = {}
+    results = []
+    for card in cards:
+        rank = CARD_RANK[card]
+        joins = by_rank.get(rank)
+        if joins is None:
+            joins = _rank_joins(scored, neighbours, rank)
+            by_rank[rank] = joins
+        below, above, prefixes, suffixes, joined = joins
+        new_scores = dict(joined)
+        index = CARD_SPECIES[card]
+        new_scores[ALL_SPECIES[index]] = _own_species_score(
+            scored,
+            index,
+            rank,
+            below,
+            above,
+            prefixes[index],
+            suffixes[index],
+            new_scores[ALL_SPECIES[index]],
+        )
+        results.append(new_scores)
+    return results
+
+
+def _rank_joins(scored: ScoredBoard, neighbours: list, rank: int) -> tuple:
+    """
+    The neighbours below and above `rank`, the best path into and out of
+    the cell for each species, and each species' score once a card of that
+    rank joins a path into the cell to a path out of it.
+    """
+    below = []
+    above = []
+    for neighbour, neighbour_card in neighbours:
+        if CARD_RANK[neighbour_card] < rank:
+            below.append((neighbour, CARD_SPECIES[neighbour_card]))
+        elif CARD_RANK[neighbour_card] > rank:
+            above.append((neighbour, CARD_SPECIES[neighbour_card]))
+
+    prefixes = [-1] * len(ALL_SPECIES)
+    for n, _ in below:
+        prefixes = [a if a > b else b for a, b in zip(prefixes, scored.reach[n])]
+    suffixes = [-1] * len(ALL_SPECIES)
+    for n, _ in above:
+        suffixes = [a if a > b else b for a, b in zip(suffixes, scored.back[n])]
+    joined = dict(scored.scores)
+    if below and above:
+        for index, species in enumerate(ALL_SPECIES):
+            prefix = prefixes[index]
+            suffix = suffixes[index]
+            if prefix >= 0 and suffix >= 0 and prefix + 1 + suffix > joined[species]:
+                joined[species] = prefix + 1 + suffix
+    return below, above, prefixes, suffixes, joined
+
+
+def _own_species_score(
+    scored: ScoredBoard,
+    index: int,
+    rank: int,
+    below: list,
+    above: list,
+    prefix: int,
+    suffix: int,
+    highest_score: int,
+) -> int:
+    """
+    Raises `highest_score` with the paths of the card's own species that
+    start or end at the card, and the monospecies paths through it.
+    """
+    start_bonus = 1 if rank == 1 else 0
+    end_bonus = 2 if rank == 8 else 0
+    if prefix >= 0:
+        highest_score = max(highest_score, prefix + 1 + end_bonus)
+    if suffix >= 0:
+        highest_score = max(highest_score, start_bonus + 1 + suffix)
+
+    # Monospecies paths: join the best prefix and suffix of each length.
+    mono_prefix = [-1] * 9
+    mono_prefix[1] = start_bonus
+    for n, neighbour_species in below:
+        if neighbour_species == index:
+            prev_mono = scored.mono_reach[n]
+            for length in range(1, 8):
+                if prev_mono[length] > mono_prefix[length + 1]:
+                    mono_prefix[length + 1] = prev_mono[length]
+    mono_suffix = [-1] * 9
+    mono_suffix[1] = end_bonus
+    for n, neighbour_species in above:
+        if neighbour_species == index:
+            next_mono = scored.mono_back[n]
+            for length in range(1, 8):
+                if next_mono[length] > mono_suffix[length + 1]:
+                    mono_suffix[length + 1] = next_mono[length]
+    for prefix_length in range(1, 9):
+        if mono_prefix[prefix_length] < 0:
+            continue
+        shortest_suffix = max(1, 5 - prefix_length)
+        for suffix_length in range(shortest_suffix, 10 - prefix_length):
+            if mono_suffix[suffix_length] < 0:
+                continue
+            length = prefix_length + suffix_length - 1
+            score = 2 * length + mono_prefix[prefix_length] + mono_suffix[suffix_length]
+            if score > highest_score:
+                highest_score = score
+    return highest_score
+
+
+def score_play_area(play_area: PlayArea, species: Species) -> int:
+    """
+    Calculates the total score for a given species, i.e. the value of the
+    highest scoring path that starts and ends on that species.
+    """
+    board = Board.from_play_area(play_area)
+    return _forward_tables(board)[0][SPECIES_INDEX[species]]
+
+
 def calculate_all_scores(play_area: PlayArea) -> Dict[Species, int]:
     """
     The main function to calculate scores for all species for a given play area.
@@ -167,13 +688,7 @@ def calculate_all_scores(play_area: PlayArea) -> Dict[Species, int]:
     Returns:
         A dictionary with each species and its calculated score.
     """
-    all_species = ["J", "R", "C", "M", "O", "W"]
-    final_scores = {}
-
-    for species in all_species:
-        final_scores[species] = score_play_area(play_area, species)
-
-    return final_scores
+    return board_scores(Board.from_play_area(play_area))
 
 
 # lru caching
@@ -182,7 +697,11 @@ def calculate_all_scores(play_area: PlayArea) -> Dict[Species, int]:
 # suit supersistion?
 # squich all cards compose
 #
-def calculate_scoring_probability_squash(species: Species, state: dict) -> float:
+def get_unknown_cards(state: dict, placed: Card = None) -> set[Card]:
+    """
+    Returns the cards we have not seen: not in either hand, discard pile or
+    play area, and not `placed`, a card about to be put on our play area.
+    """
     seen_cards = (
         state["hand"]
         + state["opponentHand"]
@@ -191,51 +710,103 @@ def calculate_scoring_probability_squash(species: Species, state: dict) -> float
         + list(y for x in state["playArea"].values() for y in x.values())
         + list(y for x in state["opponentPlayArea"].values() for y in x.values())
     )
+    if placed is not None:
+        seen_cards.append(placed)
 
-    unknown_cards = ALL_CARDS - {tuple(card) for card in seen_cards if not card is None}
-    num_unknown_cards_op = state["opponentHand"].count(None)
-    unknown_species_buckets = defaultdict(lambda: [0, 0])
-    for s, value in unknown_cards:
-        unknown_species_buckets[s][0] += value
-        unknown_species_buckets[s][1] += 1
-    score, count = unknown_species_buckets[species]
-    return (
-        score * count * (num_unknown_cards_op) / (len(unknown_cards))
-    ) * magic.SCORING_SQUASH_SCALE_FACTOR
+    return ALL_CARDS - {tuple(card) for card in seen_cards if not card is None}
 
 
-import magic
+@lru_cache(maxsize=1024)
+def _hand_majority_probabilities(
+    my_scores: Tuple[int, ...],
+    opponent_scores: Tuple[int, ...],
+    unknown_cards: FrozenSet[Card],
+    num_unknown_cards_op: int,
+) -> Tuple[float, ...]:
+    """
+    For each species, the exact probability that the opponent's hand outscores
+    ours once their hidden cards are filled in with a uniformly random
+    `num_unknown_cards_op`-subset of `unknown_cards`.
+
+    Only the hidden cards of a species change its hand score, so for each
+    species we count the subsets of its unknown cards by size whose rank sum
+    is high enough, read from the prebuilt tables, and pad each with any
+    choice of the remaining unknown cards.
+    """
+    if tracing.enabled:
+        tracing.counters["probability_evaluations"] += 1
+    total = binomial(len(unknown_cards), num_unknown_cards_op)
+    if total == 0:
+        return (0.0,) * len(ALL_SPECIES)
+
+    # Bit rank - 1 of a species' mask is set if that card is unknown.
+    rank_masks = [0] * len(ALL_SPECIES)
+    for species, rank in unknown_cards:
+        rank_masks[SPECIES_INDEX[species]] |= 1 << (rank - 1)
+
+    probabilities = []
+    for index, mask in enumerate(rank_masks):
+        count = mask.bit_count()
+        other_cards = len(unknown_cards) - count
+        # The opponent outscores us once their hidden cards add more than this.
+        needed = my_scores[index] - opponent_scores[index]
+        wins = 0
+        for size in range(min(count, num_unknown_cards_op) + 1):
+            padding = binomial(other_cards, num_unknown_cards_op - size)
+            if padding:
+                wins += padding * rank_tail(mask, size, needed + 1)
+        probabilities.append(wins / total)
+
+    return tuple(probabilities)
+
+
+def get_probability_inputs(
+    state: dict, unknown_cards: FrozenSet[Card] = None
+) -> tuple:
+    """
+    Returns everything the scoring probabilities depend on: both hand scores
+    per species, the unknown cards and how many opponent cards are hidden.
+    Pass `unknown_cards` if they are already known, e.g. from a GameTracker.
+    """
+    opponent_hand = [card for card in state["opponentHand"] if not card is None]
+    if unknown_cards is None:
+        unknown_cards = frozenset(get_unknown_cards(state))
+    return (
+        tuple(calc_hand_score(species, state["hand"]) for species in ALL_SPECIES),
+        tuple(calc_hand_score(species, opponent_hand) for species in ALL_SPECIES),
+        unknown_cards,
+        state["opponentHand"].count(None),
+    )
 
 
-def calculate_scoring_probability(species: Species, state: dict) -> float:
-    seen_cards = (
-        state["hand"]
-        + state["opponentHand"]
-        + state["discard"]
-        + state["opponentDiscard"]
-        + list(y for x in state["playArea"].values() for y in x.values())
-        + list(y for x in state["opponentPlayArea"].values() for y in x.values())
+def probabilities_from_inputs(
+    inputs: tuple, placed: Card = None
+) -> Dict[Species, float]:
+    """Scoring probabilities for get_probability_inputs(), with `placed` seen."""
+    if tracing.enabled:
+        tracing.counters["probability_lookups"] += 1
+    my_scores, opponent_scores, unknown_cards, num_unknown_cards_op = inputs
+    if placed is not None:
+        unknown_cards = unknown_cards - {tuple(placed)}
+    probabilities = _hand_majority_probabilities(
+        my_scores, opponent_scores, unknown_cards, num_unknown_cards_op
     )
+    return dict(zip(ALL_SPECIES, probabilities))
 
-    unknown_cards = ALL_CARDS - {tuple(card) for card in seen_cards if not card is None}
-    num_unknown_cards_op = state["opponentHand"].count(None)
-
-    from math import comb
 
-    if comb(len(unknown_cards), num_unknown_cards_op) > magic.SCORING_LIM_CALCS:
-        return calculate_scoring_probability_squash(species, state)
+def calculate_scoring_probabilities(
+    state: dict, placed: Card = None
+) -> Dict[Species, float]:
+    """
+    Returns, for every species, the probability that the opponent's hand
+    outscores ours, with `placed` counted as seen. Only the cards matter, not
+    where they are, so results are memoised across placements and subturns.
+    """
+    return probabilities_from_inputs(get_probability_inputs(state), placed)
 
-    pos_comb = list(combinations(unknown_cards, num_unknown_cards_op))
 
-    my_score = calc_hand_score(species, state["hand"])
-    probs = []
-    for combo in combinations(unknown_cards, num_unknown_cards_op):
-        op_hand = [card for card in state["opponentHand"] if not card is None] + list(
-            combo
-        )
-        if my_score < calc_hand_score(species, op_hand):
-            probs.append(1 / len(pos_comb))
-    return sum(probs)
+def calculate_scoring_probability(species: Species, state: dict) -> float:
+    return calculate_scoring_probabilities(state)[species]
 
 
 def calc_hand_score(species: Species, hand: list[Card]) -> int:
@@ -243,13 +814,68 @@ def calc_hand_score(species: Species, hand: list[Card]) -> int:
 
 
 def get_weighted_scores(state: dict) -> dict[Species, float]:
-    scores = calculate_all_scores(state["playArea"])
+    return weight_scores(
+        calculate_all_scores(state["playArea"]),
+        calculate_scoring_probabilities(state),
+    )
+
+
+def weight_scores(
+    scores: Dict[Species, int], probabilities: Dict[Species, float]
+) -> dict[Species, float]:
+    """Weights per-species board scores by the chance of scoring them."""
     return {
-        species: (score * calculate_scoring_probability(species, state))
+        species: (score * probabilities[species])
         for species, score in scores.items()
     }
 
 
+def hand_majority(hands: List[List[Card]]) -> Dict[Species, List[int]]:
+    """
+    For each species, the players who may score it at the end of the game:
+    those with the highest total rank of that species in hand. An 8 counts
+    as 0 while another player holds the 1 of its species. If nobody holds a
+    species, everyone may score it.
+    """
+    rights = {}
+    for species in ALL_SPECIES:
+        holds_one = [(species, 1) in {tuple(card) for card in hand} for hand in hands]
+        totals = []
+        for player, hand in enumerate(hands):
+            one_elsewhere = any(
+                holds for other, holds in enumerate(holds_one) if other != player
+            )
+            totals.append(
+                sum(
+                    card[1]
+                    for card in hand
+                    if card[0] == species and not (card[1] == 8 and one_elsewhere)
+                )
+            )
+        highest = max(totals)
+        rights[species] = [
+            player for player, total in enumerate(totals) if total == highest
+        ]
+    return rights
+
+
+def final_scores(
+    boards: List[Board], hands: List[List[Card]], use_cache: bool = True
+) -> List[int]:
+    """
+    Returns each player's end of game score: the sum of their path scores
+    over the species they have the right to score.
+    """
+    rights = hand_majority(hands)
+    totals = []
+    for player, board in enumerate(boards):
+        scores = board_scores(board, use_cache)
+        totals.append(
+            sum(score for species, score in scores.items() if player in rights[species])
+        )
+    return totals
+
+
 # --- Execution ---
 if __name__ == "__main__":
     # Your input dictionary
@@ -0,0 +1,267 @@
+"""
+Opt-in multi-turn search for the place subturn.
+
+A flat information-set Monte Carlo search: the candidates are the best few
+placements by value, and each iteration picks one with UCB1, deals the
+cards we cannot see (the opponent's hidden cards and the deck) at random
+from the unknown pool, and plays the game on for a few turns of draw,
+place and discard with a cheap rollout policy. A rollout is worth our final
+score minus the opponent's, counting only the species each of us would
+have the right to score with the hands at that point.
+
+Searches run on worker processes when SEARCH_WORKERS is set, each with its
+own random deals, and their statistics are merged.
+"""
+
+import atexit
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from typing import List, Tuple
+
+import magic
+import recorder
+import tracing
+from board import CARD_RANK, CARD_SPECIES, EMPTY, NEIGHBOUR_OFFSETS, Board
+from board import card_id, card_of, cell_coord
+from deadline import NO_DEADLINE, Deadline
+from scoring import final_scores, get_unknown_cards
+from session import GameSession
+
+_executor = None
+_workers = 0
+
+
+def start(workers: int):
+    """Starts `workers` search processes; does nothing if `workers` is 0."""
+    global _executor, _workers
+    if workers <= 0 or _executor is not None:
+        return
+    _executor = ProcessPoolExecutor(workers)
+    _workers = workers
+    atexit.register(stop)
+
+
+def stop():
+    """Shuts the search processes down."""
+    global _executor, _workers
+    if _executor is None:
+        return
+    _executor.shutdown(wait=False, cancel_futures=True)
+    _executor = None
+    _workers = 0
+
+
+def candidates(
+    state: dict, session: GameSession, count: int
+) -> List[Tuple[int, int]]:
+    """The `count` best (card id, cell) placements by value."""
+    table = session.placement_table(state)
+    placements = [(card, cell) for card in state["hand"] for cell in table.cells]
+    if table.batched():
+        values = table.batch_values(placements)
+    else:
+        values = [table.value(card, cell) for card, cell in placements]
+    scored = [
+        (value, card_id(card), cell)
+        for value, (card, cell) in zip(values, placements)
+    ]
+    # Stable, so equal values keep their hand order.
+    scored.sort(key=lambda entry: -entry[0])
+    return [(card, cell) for _, card, cell in scored[:count]]
+
+
+def best_play(
+    state: dict, session: GameSession, deadline: Deadline = NO_DEADLINE
+) -> tuple[tuple[str, int], tuple[int, int]]:
+    """
+    Returns the (card, coord) placement whose rollouts did best on average,
+    searching until shortly before the deadline.
+    """
+    moves = candidates(state, session, magic.SEARCH_CANDIDATES)
+    remaining = deadline.remaining()
+    if remaining is None:
+        remaining = magic.SEARCH_SECONDS
+    # Leave time to merge the statistics and send the reply.
+    seconds = remaining * 0.8
+
+    # A replay runs each recorded search again for as many rollouts as it
+    # made, whatever the speed of the machine.
+    replayed = recorder.recorded("rollouts")
+    searches = len(replayed) if replayed is not None else max(_workers, 1)
+    seeds = [random.randrange(1 << 32) for _ in range(searches)]
+    if replayed is not None:
+        results = [
+            None if rollouts is None else search(state, moves, seconds, seed, rollouts)
+            for seed, rollouts in zip(seeds, replayed)
+        ]
+    elif _executor is None:
+        results = [search(state, moves, seconds, seeds[0])]
+    else:
+        futures = [
+            _executor.submit(search, state, moves, seconds, seed) for seed in seeds
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout=max(0.0, remaining * 0.9)))
+            except TimeoutError:
+                results.append(None)
+    recorder.note(
+        "rollouts", [None if result is None else sum(result[0]) for result in results]
+    )
+
+    visits = [0] * len(moves)
+    totals = [0.0] * len(moves)
+    for result in results:
+        if result is None:
+            continue
+        search_visits, search_totals = result
+        for index in range(len(moves)):
+            visits[index] += search_visits[index]
+            totals[index] += search_totals[index]
+
+    if tracing.enabled:
+        tracing.counters["search_rollouts"] += sum(visits)
+
+    best_index = 0
+    best_mean = None
+    for index, count in enumerate(visits):
+        if count:
+            mean = totals[index] / count
+            if best_mean is None or mean > best_mean:
+                best_mean = mean
+                best_index = index
+    card, cell = moves[best_index]
+    return list(card_of(card)), cell_coord(cell)
+
+
+def search(
+    state: dict,
+    moves: List[Tuple[int, int]],
+    seconds: float,
+    seed: int,
+    rollouts: int = None,
+) -> Tuple[List[int], List[float]]:
+    """
+    Runs UCB1 over `moves` for `seconds`, or for exactly `rollouts`
+    rollouts if given, returning the number of rollouts and the summed
+    rollout values of each move. Every move gets one rollout before any gets
+    a second.
+    """
+    rng = random.Random(seed)
+    deadline = Deadline(seconds)
+    game = _Game(state)
+    visits = [0] * len(moves)
+    totals = [0.0] * len(moves)
+    played = 0
+    while played < len(moves) or (
+        played < rollouts if rollouts is not None else not deadline.expired()
+    ):
+        if played < len(moves):
+            index = played
+        else:
+            log_played = math.log(played)
+            index = max(
+                range(len(moves)),
+                key=lambda i: totals[i] / visits[i]
+                + magic.SEARCH_EXPLORATION * math.sqrt(log_played / visits[i]),
+            )
+        visits[index] += 1
+        totals[index] += game.rollout(moves[index], rng)
+        played += 1
+    return visits, totals
+
+
+class _Game:
+    """The position being searched, with the cards we have not seen."""
+
+    def __init__(self, state: dict):
+        self.boards = [
+            Board.from_play_area(state["playArea"]),
+            Board.from_play_area(state["opponentPlayArea"]),
+        ]
+        self.hands = [
+            [card_id(card) for card in state["hand"]],
+            [card_id(card) for card in state["opponentHand"] if card is not None],
+        ]
+        self.hidden = sum(card is None for card in state["opponentHand"])
+        self.deck = state["deck"]
+        self.unknown = sorted(card_id(card) for card in get_unknown_cards(state))
+
+    def rollout(self, move: Tuple[int, int], rng: random.Random) -> float:
+        """
+        Plays `move` then the rollout policy on one random deal. The cards
+        are placed on the position's own boards and taken off again
+        afterwards, rather than on copies of them.
+        """
+        unknown = self.unknown[:]
+        rng.shuffle(unknown)
+        boards = self.boards
+        hands = [
+            self.hands[0][:],
+            self.hands[1] + unknown[: self.hidden],
+        ]
+        deck = unknown[self.hidden : self.hidden + self.deck]
+        placed = []
+
+        try:
+            card, cell = move
+            hands[0].remove(card)
+            boards[0].place(cell, card)
+            placed.append((boards[0], cell))
+            _discard(hands[0])
+
+            player = 1
+            for _ in range(magic.SEARCH_ROLLOUT_TURNS * 2 - 1):
+                if not deck:
+                    break
+                hand = hands[player]
+                hand.extend(deck[-2:])
+                del deck[-2:]
+                placed.append((boards[player], _place(boards[player], hand, rng)))
+                _discard(hand)
+                player = 1 - player
+
+            hands = [[card_of(card) for card in hand] for hand in hands]
+            mine, theirs = final_scores(boards, hands, use_cache=False)
+        finally:
+            for board, cell in reversed(placed):
+                board.remove(cell)
+        return mine - theirs
+
+
+def _place(board: Board, hand: List[int], rng: random.Random) -> int:
+    """
+    Rollout placement: the card and cell with the most neighbours it can
+    extend a path with, counting neighbours of its own species twice and
+    breaking ties at random. Returns the cell.
+    """
+    grid = board.grid
+    best = -1
+    choice = None
+    for cell in board.play_cells():
+        neighbours = [grid[cell + offset] for offset in NEIGHBOUR_OFFSETS]
+        neighbours = [card for card in neighbours if card != EMPTY]
+        for card in hand:
+            rank = CARD_RANK[card]
+            species = CARD_SPECIES[card]
+            priority = rng.random()
+            for neighbour in neighbours:
+                if CARD_RANK[neighbour] != rank:
+                    priority += 2 if CARD_SPECIES[neighbour] == species else 1
+            if priority > best:
+                best = priority
+                choice = (card, cell)
+    card, cell = choice
+    hand.remove(card)
+    board.place(cell, card)
+    return cell
+
+
+def _discard(hand: List[int]):
+    """
+    Rollout discard: the lowest ranked card. Rollouts always draw from the
+    deck, so the discard piles are not tracked.
+    """
+    hand.remove(min(hand, key=CARD_RANK.__getitem__))
@@ -0,0 +1,190 @@
+"""
+Multi-game server: plays many games in one long-running set of processes,
+so Python start-up and cache warm-up are paid once rather than per game.
+
+Clients connect over a Unix socket (--socket) or a localhost TCP port
+(--port) and speak the same line-delimited protocol as stdin. A connection
+may carry one game, or several multiplexed ones: a message with a "gameID"
+field belongs to that game, and the answer carries the same "gameID". A
+message without one belongs to its connection's game.
+
+Each game is routed by a hash of its id to one of the worker processes.
+The worker keeps a GameSession per connection and game between messages,
+and answers its messages one at a time in the order they arrived, so each
+game sees its messages in order. The single-stream mode of index.py is
+unchanged.
+
+    python server.py --socket /tmp/arboretum.sock --workers 4
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import zlib
+from contextlib import redirect_stdout
+
+import magic
+import tracing
+from protocol import READ_BUFFER_SIZE, loads
+from readLine import handle_line
+from session import GameSession
+
+_GAME_ID = re.compile(rb'"gameID"\s*:\s*("(?:[^"\\]|\\.)*"|-?\d+)')
+_END_GAME = re.compile(rb'"message"\s*:\s*"ENDGAME"')
+
+
+def eprint(*args, **kwargs):
+    """Prints to stderr."""
+    print(*args, file=sys.stderr, **kwargs)
+
+
+def game_id(line: bytes):
+    """The JSON-encoded gameID of a message line, or None if it has none."""
+    match = _GAME_ID.search(line)
+    return None if match is None else match.group(1)
+
+
+class Router:
+    """
+    Worker processes, each answering the games hashed to it. Answers are
+    handed to `deliver(connection, data)` from a background thread.
+    """
+
+    def __init__(self, workers: int, deliver):
+        self.results = multiprocessing.Queue()
+        self.tasks = [multiprocessing.Queue() for _ in range(workers)]
+        self.processes = [
+            multiprocessing.Process(target=_work, args=(tasks, self.results))
+            for tasks in self.tasks
+        ]
+        for process in self.processes:
+            process.start()
+        self.collector = threading.Thread(
+            target=self._collect, args=(deliver,), daemon=True
+        )
+        self.collector.start()
+
+    def submit(self, connection: int, line: bytes):
+        """Queues a message line received on `connection`."""
+        game = game_id(line)
+        key = str(connection).encode() if game is None else game
+        self.tasks[zlib.crc32(key) % len(self.tasks)].put((connection, line))
+
+    def close(self, connection: int):
+        """Drops the sessions of a connection that has closed."""
+        for tasks in self.tasks:
+            tasks.put((connection, None))
+
+    def stop(self):
+        """Lets the workers finish their queued messages, then stops them."""
+        for tasks in self.tasks:
+            tasks.put(None)
+        for process in self.processes:
+            process.join()
+        self.results.put(None)
+        self.collector.join()
+
+    def _collect(self, deliver):
+        while (result := self.results.get()) is not None:
+            deliver(*result)
+
+
+def _work(tasks, results):
+    """Worker process: answers messages, keeping a session per game."""
+    tracing.configure(magic.TRACE_OUTPUT)
+    sessions = {}
+    while (task := tasks.get()) is not None:
+        connection, line = task
+        if line is None:
+            for key in [key for key in sessions if key[0] == connection]:
+                del sessions[key]
+            continue
+        game = game_id(line)
+        key = (connection, game)
+        output = io.StringIO()
+        session = sessions.get(key) or GameSession()
+        try:
+            with redirect_stdout(output):
+                session = handle_line(line, session)
+        except Exception as e:
+            # One broken message must not stop the other games on this worker.
+            eprint(f"Error handling a message of game {key}: {e!r}")
+        if _END_GAME.search(line):
+            sessions.pop(key, None)
+        else:
+            sessions[key] = session
+
+        answers = output.getvalue().splitlines()
+        if game is not None:
+            tag = {"gameID": loads(game)}
+            answers = [json.dumps({**tag, **json.loads(answer)}) for answer in answers]
+        results.put((connection, "".join(answer + "\n" for answer in answers)))
+
+
+async def serve(workers: int, path: str = None, port: int = None):
+    """Accepts connections until cancelled."""
+    loop = asyncio.get_running_loop()
+    writers = {}
+    connections = itertools.count()
+
+    def deliver(connection: int, data: str):
+        writer = writers.get(connection)
+        if writer is not None:
+            writer.write(data.encode())
+
+    router = Router(
+        workers, lambda *result: loop.call_soon_threadsafe(deliver, *result)
+    )
+
+    async def client(reader, writer):
+        connection = next(connections)
+        writers[connection] = writer
+        try:
+            while line := await reader.readline():
+                router.submit(connection, line)
+                await writer.drain()
+        finally:
+            router.close(connection)
+            writers.pop(connection, None)
+            writer.close()
+
+    if path is not None:
+        server = await asyncio.start_unix_server(
+            client, path, limit=READ_BUFFER_SIZE
+        )
+    else:
+        server = await asyncio.start_server(
+            client, "127.0.0.1", port, limit=READ_BUFFER_SIZE
+        )
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await loop.run_in_executor(None, router.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--socket", help="Unix socket path to listen on")
+    address.add_argument("--port", type=int, help="localhost TCP port to listen on")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.socket is not None and os.path.exists(args.socket):
+        os.unlink(args.socket)
+    try:
+        asyncio.run(serve(args.workers, args.socket, args.port))
+    except KeyboardInterrupt:
+        eprint("Server stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Per-game caches. A GameSession is created on NEWGAME and cleared on ENDGAME,
+and the handlers take it as an argument instead of reading module globals,
+so nothing outlives its game and several games can share a process.
+"""
+
+from discard import get_opponent_state
+from tracker import GameTracker
+from values import PlacementTable
+
+
+def turn_key(state: dict) -> tuple:
+    """The point in the game a state describes, which no other state shares."""
+    return (state["turn"], state["subTurn"], state.get("activeTurn"))
+
+
+class GameSession:
+    """
+    The caches of one game: the tracker, which keeps both play areas' boards
+    and the cards we have not seen up to date from message to message, and
+    the placement tables for both play areas built on it.
+
+    Each entry remembers the turn_key() of the state it was brought up to
+    date with. It is reused as it is for the rest of that message; on the
+    next one the table is updated, keeping whatever the state left unchanged.
+    """
+
+    def __init__(self):
+        self.tracker = GameTracker()
+        self.placements = PlacementTable()
+        self.opponent_placements = PlacementTable()
+        self.entries = {}
+
+    def clear(self):
+        """Forgets everything, as at the end of a game."""
+        self.tracker.clear()
+        self.placements.clear()
+        self.opponent_placements.clear()
+        self.entries.clear()
+
+    def is_valid(self, name: str, state: dict) -> bool:
+        """Whether the entry `name` was built from this point in the game."""
+        entry = self.entries.get(name)
+        return entry is not None and entry[0] == turn_key(state)
+
+    def _entry(self, name: str, state: dict, build):
+        if not self.is_valid(name, state):
+            self.entries[name] = (turn_key(state), build(state))
+        return self.entries[name][1]
+
+    def track(self, state: dict) -> GameTracker:
+        """The tracker, up to date with `state`."""
+        return self._entry("tracker", state, self.tracker.update)
+
+    def placement_table(self, state: dict) -> PlacementTable:
+        """Our placement table, up to date with `state`."""
+        return self._entry(
+            "placements",
+            state,
+            lambda state: self.placements.update(state, self.track(state)),
+        )
+
+    def opponent_table(self, state: dict) -> PlacementTable:
+        """The opponent's placement table, seen from their side."""
+        return self._entry(
+            "opponentPlacements",
+            state,
+            lambda state: self.opponent_placements.update(
+                get_opponent_state(state), self.track(state), "opponentPlayArea"
+            ),
+        )
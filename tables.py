@@ -0,0 +1,117 @@
+"""
+Static lookup tables, generated once at build time into tables.bin and
+mapped into memory at startup:
+
+- the card encoding of board.py: the species index and rank of each card id;
+- binomial coefficients C(n, k) for n, k <= 48;
+- rank-subset tails for the hand-majority probabilities: for each set of
+  ranks of one species (a bit mask, bit r - 1 for rank r), each subset size
+  and each threshold t, how many subsets of that size have a rank sum of at
+  least t.
+
+If the file is missing or was written by another version, the tables are
+computed in-process instead, so a source checkout works without a build.
+
+    python tables.py            # writes tables.bin next to this file
+"""
+
+import mmap
+import os
+import struct
+import sys
+from itertools import combinations
+from math import comb
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables.bin")
+
+CARDS = 48
+COMB_N = CARDS + 1
+RANK_MASKS = 1 << 8
+SIZES = 9
+# Rank sums run from 0 to 36; a threshold of 37 is never reached.
+THRESHOLDS = 38
+
+_HEADER = struct.Struct("<4sI8x")
+_FORMAT = b"ARBT"
+_VERSION = 1
+
+_BINOMIAL_OFFSET = _HEADER.size
+_CARD_OFFSET = _BINOMIAL_OFFSET + COMB_N * COMB_N * 8
+_TAILS_OFFSET = _CARD_OFFSET + 2 * CARDS
+_SIZE = _TAILS_OFFSET + RANK_MASKS * SIZES * THRESHOLDS
+
+
+def generate() -> bytes:
+    """Computes the tables in their file layout."""
+    data = bytearray(_SIZE)
+    _HEADER.pack_into(data, 0, _FORMAT, _VERSION)
+
+    binomial = memoryview(data)[_BINOMIAL_OFFSET:_CARD_OFFSET].cast("Q")
+    for n in range(COMB_N):
+        for k in range(n + 1):
+            binomial[n * COMB_N + k] = comb(n, k)
+
+    for card in range(CARDS):
+        data[_CARD_OFFSET + card] = card // 8
+        data[_CARD_OFFSET + CARDS + card] = card % 8 + 1
+
+    for mask in range(RANK_MASKS):
+        ranks = [rank for rank in range(1, 9) if mask >> (rank - 1) & 1]
+        for size in range(len(ranks) + 1):
+            counts = [0] * THRESHOLDS
+            for subset in combinations(ranks, size):
+                counts[sum(subset)] += 1
+            base = _TAILS_OFFSET + (mask * SIZES + size) * THRESHOLDS
+            tail = 0
+            for threshold in range(THRESHOLDS - 1, -1, -1):
+                tail += counts[threshold]
+                data[base + threshold] = tail
+    return bytes(data)
+
+
+def write(path: str = PATH):
+    """Generates the tables into `path`."""
+    with open(path, "wb") as file:
+        file.write(generate())
+
+
+def load(path: str = PATH):
+    """Maps `path` read-only, or generates the tables if it is unusable."""
+    try:
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(data) == _SIZE and _HEADER.unpack_from(data) == (_FORMAT, _VERSION):
+            return data
+    except (OSError, ValueError):
+        pass
+    return generate()
+
+
+_data = memoryview(load())
+
+BINOMIAL = _data[_BINOMIAL_OFFSET:_CARD_OFFSET].cast("Q")
+# Hot loops index these, which is faster on lists than on a memoryview.
+CARD_SPECIES = list(_data[_CARD_OFFSET : _CARD_OFFSET + CARDS])
+CARD_RANK = list(_data[_CARD_OFFSET + CARDS : _TAILS_OFFSET])
+RANK_TAILS = _data[_TAILS_OFFSET:_SIZE]
+
+
+def binomial(n: int, k: int) -> int:
+    """C(n, k), or 0 when k is out of range."""
+    if k < 0 or k > n:
+        return 0
+    return BINOMIAL[n * COMB_N + k]
+
+
+def rank_tail(mask: int, size: int, threshold: int) -> int:
+    """
+    The number of `size`-subsets of the ranks in `mask` whose rank sum is
+    at least `threshold`.
+    """
+    if threshold >= THRESHOLDS:
+        return 0
+    return RANK_TAILS[(mask * SIZES + size) * THRESHOLDS + max(threshold, 0)]
+
+
+if __name__ == "__main__":
+    write(sys.argv[1] if len(sys.argv) > 1 else PATH)
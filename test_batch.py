@@ -0,0 +1,62 @@
+import random
+
+import magic
+from batch import BoardArrays, score_batch
+from bench import make_state
+from board import cell_coord
+from deadline import Deadline
+from place import get_best_play
+from scoring import ALL_SPECIES, score_placement
+from session import GameSession
+
+
+def test_batch_matches_single_placements():
+    rng = random.Random(23)
+    for size in [0, 1, 4, 10, 20, 35] * 3:
+        table = GameSession().placement_table(make_state(rng, size))
+        placements = [(card, cell) for card in range(48) for cell in table.cells]
+        scores = score_batch(BoardArrays(table.scored), placements)
+        for row, (card, cell) in zip(scores.tolist(), placements):
+            expected = score_placement(table.scored, card, cell)
+            assert row == [expected[species] for species in ALL_SPECIES]
+
+
+def test_batched_values_match_unbatched():
+    rng = random.Random(29)
+    for size in [0, 3, 12, 30]:
+        state = make_state(rng, size)
+        cards = sorted(GameSession().placement_table(state).unknown_cards)
+        results = []
+        for batched in [False, True]:
+            previous = magic.apply({"BATCH_SCORING": batched})
+            try:
+                table = GameSession().placement_table(state)
+                assert table.batched() == batched
+                results.append(table.best_values(cards))
+            finally:
+                magic.apply(previous)
+        assert results[0] == results[1]
+
+
+def test_batched_play_matches_exhaustive_search():
+    rng = random.Random(37)
+    for size in [0, 1, 4, 10, 20, 35] * 2:
+        state = make_state(rng, size)
+        table = GameSession().placement_table(state)
+        assert table.batched()
+        candidates = [(card, cell) for card in state["hand"] for cell in table.cells]
+        values = [table.value(card, cell) for card, cell in candidates]
+        card, cell = candidates[values.index(max(values, default=0))]
+        assert get_best_play(state, GameSession()) == (card, cell_coord(cell))
+
+
+def test_expired_deadline_stops_batched_play_after_the_most_promising_card():
+    state = make_state(random.Random(31), 12)
+    table = GameSession().placement_table(state)
+    cells = list(table.cells)
+    card = max(
+        state["hand"], key=lambda card: max(table.bound(card, cell) for cell in cells)
+    )
+    values = table.batch_values([(card, cell) for cell in cells])
+    expected = (card, cell_coord(cells[values.index(max(values))]))
+    assert get_best_play(state, GameSession(), Deadline(0)) == expected
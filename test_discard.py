@@ -0,0 +1,21 @@
+import magic
+from deadline import Deadline
+from discard import get_card_rankings, get_discard_card
+from session import GameSession
+from test_draw import STATE
+
+DISCARD_STATE = {**STATE, "subTurn": 3, "activeTurn": True}
+
+
+def test_discard_gives_the_opponent_the_least():
+    session = GameSession()
+    rankings = get_card_rankings(DISCARD_STATE, session)
+    candidates = rankings[: magic.DISCARD_CANDIDATE_COUNT]
+    table = session.opponent_table(DISCARD_STATE)
+    least = min(candidates, key=lambda entry: table.best_value(entry[0]))[0]
+    assert get_discard_card(DISCARD_STATE, GameSession()) == least
+
+
+def test_expired_deadline_discards_our_worst_card():
+    worst = get_card_rankings(DISCARD_STATE, GameSession())[0][0]
+    assert get_discard_card(DISCARD_STATE, GameSession(), deadline=Deadline(0)) == worst
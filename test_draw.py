@@ -0,0 +1,61 @@
+import pool
+from deadline import Deadline
+from draw import assess_draw
+from session import GameSession
+
+STATE = {
+    "deck": 20,
+    "hand": [["R", 1], ["J", 3], ["R", 4], ["J", 5], ["O", 4], ["J", 4], ["R", 3]],
+    "discard": [["W", 1]],
+    "opponentDiscard": [["C", 5], ["R", 5]],
+    "playArea": {
+        "0": {"0": ["W", 2], "1": ["C", 6], "2": ["R", 7], "-1": ["M", 8]},
+        "1": {"0": ["O", 6], "1": ["M", 4], "2": ["O", 1], "-1": ["O", 5]},
+        "-1": {"0": ["R", 6], "1": ["C", 4], "-1": ["C", 3]},
+    },
+    "opponentPlayArea": {
+        "0": {"0": ["W", 8], "-1": ["R", 2]},
+        "-1": {"0": ["M", 6], "1": ["O", 8], "2": ["M", 7]},
+    },
+    "opponentHand": [None, ["W", 5], ["R", 8], None, None, ["C", 1], ["C", 8]],
+    "turn": 20,
+    "subTurn": 0,
+    "previousTurn": {"move": ["R", 5], "metaData": False},
+}
+
+
+def test_pool_matches_serial_evaluation():
+    session = GameSession()
+    table = session.placement_table(STATE)
+    cards = sorted(table.unknown_cards) + [["W", 1], ["R", 5]]
+    expected = [table.best_value(card) for card in cards]
+
+    pool.start(2)
+    try:
+        assert pool.best_values(STATE, cards) == expected
+        # A second call with the same state reuses the published state.
+        assert pool.best_values(STATE, cards[:3]) == expected[:3]
+        assert assess_draw(STATE, session) in (0, 1, 2)
+    finally:
+        pool.stop()
+
+
+def test_pool_answers_after_a_call_cut_short():
+    state = {**STATE, "discard": [["W", 1], ["R", 7]]}
+    table = GameSession().placement_table(state)
+    cards = sorted(table.unknown_cards)
+    expected = [table.best_value(card) for card in cards]
+
+    pool.start(2)
+    try:
+        # Leaves tasks of the first call queued while the state changes.
+        pool.best_values(STATE, cards, Deadline(0))
+        assert pool.best_values(state, cards) == expected
+    finally:
+        pool.stop()
+
+
+def test_expired_deadline_still_answers():
+    state = {**STATE, "discard": [], "opponentDiscard": []}
+    assert assess_draw(state, GameSession(), Deadline(0)) == 0
+    assert assess_draw(STATE, GameSession(), Deadline(0)) in (1, 2)
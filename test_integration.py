@@ -3,10 +3,13 @@
 import json
 import sys
 from readLine import randomIsh
+from session import GameSession
 
 def test_placement_and_discard():
     """Test the integrated placement and discard logic with actual game format"""
     
+    session = GameSession()
+
     # Sample game state in the format that place() expects (actual gameplay format)
     game_data = {
         "messageID": "test-123",
@@ -45,7 +48,7 @@ def test_placement_and_discard():
     
     f = io.StringIO()
     with redirect_stdout(f):
-        randomIsh(placement_data)
+        randomIsh(placement_data, session)
     placement_output = f.getvalue().strip()
     
     print("Placement Output:", placement_output)
@@ -59,7 +62,7 @@ def test_placement_and_discard():
     
     f = io.StringIO()
     with redirect_stdout(f):
-        randomIsh(discard_data)
+        randomIsh(discard_data, session)
     discard_output = f.getvalue().strip()
     
     print("Discard Output:", discard_output)
@@ -0,0 +1,64 @@
+import json
+import threading
+
+import magic
+import ponder
+import tracing
+from readLine import handle_line
+from session import GameSession
+from test_draw import STATE
+
+# STATE with as many cards in the deck as it leaves unseen, so the tracker
+# follows it from message to message rather than reading it again.
+OPPONENT_TURN = {**STATE, "deck": 15, "activeTurn": False}
+ACTIVE_TURN = {**OPPONENT_TURN, "activeTurn": True}
+
+
+def test_next_active_turn_reuses_the_pondered_table(tmp_path, capsys):
+    session = GameSession()
+    trace = tmp_path / "trace.jsonl"
+    previous = magic.apply({"BATCH_SCORING": False})
+    try:
+        ponder.start(OPPONENT_TURN, session)
+        ponder._thread.join()
+        table = session.placement_table(OPPONENT_TURN)
+        scored = table.scored
+        pondered = dict(table.values)
+
+        tracing.configure(str(trace))
+        line = json.dumps({"messageID": 1, "state": ACTIVE_TURN})
+        handle_line(line.encode(), session)
+    finally:
+        tracing.configure(None)
+        magic.apply(previous)
+        ponder.stop()
+    capsys.readouterr()
+
+    assert session.placement_table(ACTIVE_TURN) is table
+    assert table.scored is scored
+    assert pondered and pondered.items() <= table.values.items()
+    counters = json.loads(trace.read_text())["counters"]
+    assert counters["value_cache_hits"] > counters.get("values_computed", 0)
+
+
+def test_stop_cancels_the_card_loop_and_joins():
+    session = GameSession()
+    table = session.placements
+    inside = threading.Event()
+    calls = []
+
+    def best_value(card):
+        calls.append(card)
+        inside.set()
+        # Long enough for stop() to be called while the loop is mid-way.
+        threading.Event().wait(0.05)
+        return 0.0
+
+    table.best_value = best_value
+    ponder.start(OPPONENT_TURN, session)
+    thread = ponder._thread
+    assert inside.wait(5)
+    ponder.stop()
+    assert not thread.is_alive()
+    assert ponder._thread is None
+    assert len(calls) == 1
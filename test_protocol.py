@@ -0,0 +1,56 @@
+import json
+
+import protocol
+from protocol import decode, loads, send
+from test_draw import STATE
+
+
+def line_of(message: dict) -> bytes:
+    return (json.dumps(message) + "\n").encode()
+
+
+def test_opponent_turns_are_decoded_only_to_their_message_id():
+    state = {**STATE, "activeTurn": False}
+    for message_id in [7, -12, 'a "quoted" id', "back\\slash", "café"]:
+        line = line_of({"messageID": message_id, "state": state})
+        assert decode(line, full=False) == {
+            "messageID": message_id,
+            "state": {"activeTurn": False},
+        }
+        assert decode(line) == json.loads(line)
+
+
+def test_game_messages_and_active_turns_are_decoded_in_full():
+    lines = [
+        line_of({"messageID": 3, "state": {"message": "ENDGAME", "activeTurn": False}}),
+        line_of({"messageID": 4, "state": {**STATE, "activeTurn": True}}),
+    ]
+    for line in lines:
+        assert decode(line, full=False) == json.loads(line)
+
+
+def test_send_writes_what_print_of_json_dumps_writes(capsys):
+    outputs = [
+        {"move": 0, "messageID": 1},
+        {"move": {"card": ["W", 8], "coord": [-3, 12]}, "messageID": "id \"9\""},
+        {"move": "RANDOM", "messageID": "café"},
+        {"move": ["J", 1], "messageID": 2.5},
+    ]
+    for output in outputs:
+        send(output)
+        sent = capsys.readouterr().out
+        print(json.dumps(output))
+        assert sent == capsys.readouterr().out
+
+
+def test_orjson_and_the_standard_library_decode_alike(monkeypatch):
+    lines = [
+        line_of({"messageID": 1, "state": {**STATE, "activeTurn": True}}),
+        line_of({"messageID": "😀 é \"x\"", "state": {"message": "NEWGAME"}}),
+        b'{"messageID": 12345678901234567890, "a": [0.1, 1e-7, -0.0, 2.5e300]}\n',
+        b'{"messageID":5,"state":{"activeTurn":false,"hand":[]}}\n',
+    ]
+    decoded = [loads(line) for line in lines]
+    monkeypatch.setattr(protocol, "orjson", None)
+    assert [loads(line) for line in lines] == decoded
+    assert decoded == [json.loads(line) for line in lines]
@@ -0,0 +1,11 @@
+from referee import play_game
+
+
+def test_self_play_game():
+    result = play_game(3)
+    assert result["illegalMoves"] == 0
+    assert len(result["scores"]) == 2
+    # 34 cards are left after the deal and each turn draws at most two.
+    assert result["turns"] >= 17
+    for latencies in result["latencies"]:
+        assert len(latencies["place"]) == len(latencies["discard"])
@@ -0,0 +1,63 @@
+import json
+
+import magic
+import recorder
+import replay
+from readLine import handle_line
+from session import GameSession
+from test_draw import STATE
+
+
+STATES = [
+    {"message": "NEWGAME"},
+    {**STATE, "activeTurn": True},
+    {**STATE, "subTurn": 2, "activeTurn": True},
+    {**STATE, "subTurn": 3, "activeTurn": True},
+    {**STATE, "activeTurn": False},
+]
+
+
+def record_game(path: str, states: list):
+    recorder.configure(path)
+    try:
+        session = GameSession()
+        for index, state in enumerate(states):
+            line = json.dumps({"messageID": index, "state": state}) + "\n"
+            session = handle_line(line.encode(), session)
+    finally:
+        recorder.configure(None)
+
+
+def test_replay_matches_recording(tmp_path, capsys):
+    path = str(tmp_path / "game.log.gz")
+    record_game(path, STATES)
+    capsys.readouterr()
+
+    records = list(recorder.read(path))
+    assert [record["message"] for record in records] == [
+        json.dumps({"messageID": index, "state": state})
+        for index, state in enumerate(STATES)
+    ]
+    assert all(len(record["responses"]) == 1 for record in records)
+    for record, responses, seconds in replay.replay(path):
+        assert responses == record["responses"]
+        assert seconds >= 0
+
+
+def test_replay_stops_where_the_deadline_stopped_the_move(tmp_path, capsys):
+    path = str(tmp_path / "game.log.gz")
+    # Draw and discard stop after their first check; the search runs for
+    # however many rollouts fit in 50ms here.
+    budgets = {0: 0.0, 1: 0.0, 2: 0.05, 3: 0.0}
+    previous = magic.apply({"MOVE_BUDGETS": budgets, "SEARCH_PLACE": True})
+    try:
+        record_game(path, STATES)
+        capsys.readouterr()
+
+        records = list(recorder.read(path))
+        assert [record["checks"] for record in records[1:4]] == [0, None, 0]
+        assert records[2]["notes"]["rollouts"][0] > 0
+        for record, responses, _ in replay.replay(path):
+            assert responses == record["responses"]
+    finally:
+        magic.apply(previous)
@@ -0,0 +1,193 @@
+import random
+from itertools import combinations
+
+import tracing
+from board import Board, card_id, cell_index
+from scoring import (
+    ALL_CARDS,
+    calc_hand_score,
+    calculate_all_scores,
+    calculate_scoring_probabilities,
+    get_unknown_cards,
+    hand_majority,
+    ScoredBoard,
+    score_cache,
+    score_board,
+    score_placement,
+    score_placements,
+    score_play_area_dfs,
+)
+from utils import get_valid_play_coordinates
+
+
+def random_play_area(rng: random.Random, size: int, species: str = "JRCMOW") -> dict:
+    """Grows a connected arboretum of up to `size` distinct cards."""
+    deck = sorted(card for card in ALL_CARDS if card[0] in species)
+    rng.shuffle(deck)
+    play_area = {}
+    for card in deck[:size]:
+        coord = rng.choice(sorted(get_valid_play_coordinates(play_area)))
+        play_area.setdefault(str(coord[0]), {})[str(coord[1])] = list(card)
+    return play_area
+
+
+def test_calculate_all_scores_matches_dfs():
+    rng = random.Random(1234)
+    for _ in range(300):
+        play_area = random_play_area(rng, rng.randint(0, 40))
+        expected = {
+            species: score_play_area_dfs(play_area, species)
+            for species in ["J", "R", "C", "M", "O", "W"]
+        }
+        assert calculate_all_scores(play_area) == expected
+
+
+def test_calculate_all_scores_matches_dfs_few_species():
+    # Boards of one or two species exercise the monospecies bonus.
+    rng = random.Random(4321)
+    for _ in range(300):
+        species = "".join(rng.sample("JRCMOW", rng.randint(1, 2)))
+        play_area = random_play_area(rng, rng.randint(0, 16), species)
+        expected = {
+            species: score_play_area_dfs(play_area, species)
+            for species in ["J", "R", "C", "M", "O", "W"]
+        }
+        assert calculate_all_scores(play_area) == expected
+
+
+def test_calculate_all_scores_bonuses():
+    # J1 -> J2 -> J3 -> J8: monospecies of four, starts with 1, ends with 8.
+    play_area = {
+        "0": {"0": ["J", 1], "1": ["J", 2], "2": ["J", 3], "3": ["J", 8]},
+        "1": {"0": ["R", 2], "1": ["W", 5]},
+    }
+    scores = calculate_all_scores(play_area)
+    assert scores["J"] == 4 + 4 + 1 + 2
+    assert scores["R"] == 0
+    assert scores["W"] == 0
+
+
+def test_score_placement_matches_full_rescore():
+    rng = random.Random(99)
+    for _ in range(300):
+        species = "".join(rng.sample("JRCMOW", rng.randint(1, 6)))
+        play_area = random_play_area(rng, rng.randint(0, 30), species)
+        placed = {tuple(card) for row in play_area.values() for card in row.values()}
+        remaining = sorted(ALL_CARDS - placed)
+        if not remaining:
+            continue
+        scored = score_board(Board.from_play_area(play_area))
+        for coord in sorted(get_valid_play_coordinates(play_area)):
+            card = rng.choice(remaining)
+            expected_area = {x: dict(row) for x, row in play_area.items()}
+            expected_area.setdefault(str(coord[0]), {})[str(coord[1])] = list(card)
+            new_scores = score_placement(scored, card_id(card), cell_index(coord))
+            assert new_scores == calculate_all_scores(expected_area)
+
+
+def test_score_placements_match_one_at_a_time():
+    rng = random.Random(5)
+    for _ in range(100):
+        play_area = random_play_area(rng, rng.randint(1, 30))
+        placed = {tuple(card) for row in play_area.values() for card in row.values()}
+        cards = [card_id(card) for card in sorted(ALL_CARDS - placed)]
+        board = Board.from_play_area(play_area)
+        scored = score_board(board)
+        for cell in board.play_cells():
+            batch = rng.sample(cards, min(len(cards), 12))
+            expected = [score_placement(scored, card, cell) for card in batch]
+            assert score_placements(scored, batch, cell) == expected
+
+
+def test_score_cache_shares_translated_boards():
+    score_cache.clear()
+    play_area = {"0": {"0": ["J", 1], "1": ["J", 2]}, "1": {"1": ["R", 3]}}
+    translated = {"5": {"-3": ["J", 1], "-2": ["J", 2]}, "6": {"-2": ["R", 3]}}
+    mirrored = {"0": {"0": ["J", 1], "1": ["J", 2]}, "-1": {"1": ["R", 3]}}
+
+    scores = calculate_all_scores(play_area)
+    assert calculate_all_scores(translated) == scores
+    calculate_all_scores(mirrored)
+    info = score_cache.info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+    score_cache.resize(1)
+    assert score_cache.info().currsize == 1
+
+
+def test_score_board_reuses_tables_of_translated_boards():
+    rng = random.Random(5)
+    for size in [1, 6, 15, 30]:
+        score_cache.clear()
+        play_area = random_play_area(rng, size)
+        score_board(Board.from_play_area(play_area))
+        moved = {
+            str(int(x) + 3): {str(int(y) - 2): card for y, card in row.items()}
+            for x, row in play_area.items()
+        }
+        board = Board.from_play_area(moved)
+        scored = score_board(board)
+        assert score_cache.info().hits == 1
+        fresh = ScoredBoard(board)
+        for name in ["scores", "reach", "mono_reach", "back", "mono_back"]:
+            assert getattr(scored, name) == getattr(fresh, name)
+        for cell in board.play_cells():
+            for card in rng.sample(range(48), 4):
+                expected = score_placement(fresh, card, cell)
+                assert score_placement(scored, card, cell) == expected
+
+
+def test_score_cache_keeps_backward_tables_built_after_a_hit():
+    rng = random.Random(9)
+    play_area = random_play_area(rng, 20)
+    score_cache.clear()
+    score_board(Board.from_play_area(play_area)).back
+    tracing.enabled = True
+    try:
+        tracing.counters.clear()
+        scored = score_board(Board.from_play_area(play_area))
+        assert scored.back == ScoredBoard(scored.board).back
+        # The second ScoredBoard above is the only one that ran the DP.
+        assert tracing.counters["dp_nodes_expanded"] == 2 * scored.board.count
+        assert tracing.counters["score_cache_hits"] == 1
+    finally:
+        tracing.enabled = False
+        tracing.counters.clear()
+
+
+def test_scoring_probabilities_match_enumeration():
+    rng = random.Random(7)
+    for _ in range(100):
+        deck = sorted(ALL_CARDS)
+        rng.shuffle(deck)
+        hidden = rng.randint(0, 4)
+        opponent_hand = [list(card) for card in deck[7 : 14 - hidden]]
+        state = {
+            "hand": [list(card) for card in deck[:7]],
+            "opponentHand": opponent_hand + [None] * hidden,
+            "discard": [list(card) for card in deck[14:24]],
+            "opponentDiscard": [list(card) for card in deck[24:34]],
+            "playArea": {},
+            "opponentPlayArea": {},
+        }
+        probabilities = calculate_scoring_probabilities(state)
+
+        unknown_cards = get_unknown_cards(state)
+        hands = list(combinations(unknown_cards, hidden))
+        for species in ["J", "R", "C", "M", "O", "W"]:
+            my_score = calc_hand_score(species, state["hand"])
+            wins = sum(
+                my_score < calc_hand_score(species, opponent_hand + list(hand))
+                for hand in hands
+            )
+            assert abs(probabilities[species] - wins / len(hands)) < 1e-12
+
+
+def test_hand_majority():
+    hands = [[("J", 8), ("R", 3)], [("J", 1), ("R", 2), ("R", 1)]]
+    rights = hand_majority(hands)
+    # The 8 counts for nothing against the 1.
+    assert rights["J"] == [1]
+    assert rights["R"] == [0, 1]
+    # Nobody holds a Cassia, so both may score it.
+    assert rights["C"] == [0, 1]
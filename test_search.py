@@ -0,0 +1,39 @@
+import random
+
+import magic
+import search
+from board import card_id, cell_index
+from deadline import Deadline
+from session import GameSession
+from test_draw import STATE
+
+PLACE_STATE = dict(STATE, subTurn=2, hand=STATE["hand"] + [["W", 1], ["M", 1]])
+
+
+def test_search_plays_a_candidate():
+    session = GameSession()
+    moves = search.candidates(PLACE_STATE, session, 3)
+    visits, totals = search.search(PLACE_STATE, moves, 0.05, seed=1)
+    # Every candidate is tried at least once, even with no time to spare.
+    assert all(visits)
+    assert len(totals) == len(moves)
+
+    card, coord = search.best_play(PLACE_STATE, session, Deadline(0.1))
+    assert card in PLACE_STATE["hand"]
+    moves = search.candidates(PLACE_STATE, session, magic.SEARCH_CANDIDATES)
+    assert (card_id(card), cell_index(coord)) in moves
+
+
+def test_rollouts_give_the_boards_back_unchanged():
+    session = GameSession()
+    moves = search.candidates(PLACE_STATE, session, 3)
+    game = search._Game(PLACE_STATE)
+    before = [board.copy() for board in game.boards]
+    rng = random.Random(3)
+    for move in moves * 5:
+        game.rollout(move, rng)
+    for board, original in zip(game.boards, before):
+        assert board.grid == original.grid
+        assert board.frontier == original.frontier
+        assert board.species_cells == original.species_cells
+        assert board.count == original.count
@@ -0,0 +1,35 @@
+import json
+import threading
+
+from server import Router
+from test_draw import STATE
+
+
+def test_router_answers_each_game_in_order():
+    answers = []
+    done = threading.Event()
+
+    def deliver(connection, data):
+        answers.extend((connection, json.loads(line)) for line in data.splitlines())
+        if len(answers) == 6:
+            done.set()
+
+    router = Router(2, deliver)
+    try:
+        for game in ["a", "b"]:
+            states = [
+                {"message": "NEWGAME"},
+                {**STATE, "subTurn": 2, "activeTurn": True},
+                {"message": "ENDGAME"},
+            ]
+            for message_id, state in enumerate(states):
+                message = {"gameID": game, "messageID": message_id, "state": state}
+                router.submit(0, json.dumps(message).encode() + b"\n")
+        assert done.wait(30)
+    finally:
+        router.stop()
+
+    for game in ["a", "b"]:
+        replies = [answer for _, answer in answers if answer["gameID"] == game]
+        assert [reply["messageID"] for reply in replies] == [0, 1, 2]
+        assert replies[1]["move"]["card"] in STATE["hand"]
@@ -0,0 +1,18 @@
+from session import GameSession
+from test_draw import STATE
+
+
+def test_entries_are_kept_for_one_point_in_the_game():
+    session = GameSession()
+    table = session.placement_table(STATE)
+    signature = table.signature
+    assert session.is_valid("placements", STATE)
+
+    # The next subturn revalidates the table against the new state.
+    played = {**STATE, "subTurn": 1, "playArea": {"0": {"0": ["W", 2]}}}
+    assert not session.is_valid("placements", played)
+    assert session.placement_table(played).signature != signature
+
+    session.clear()
+    assert not session.is_valid("placements", played)
+    assert session.placements.signature is None
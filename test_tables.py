@@ -0,0 +1,26 @@
+from itertools import combinations
+from math import comb
+
+import tables
+
+
+def test_tables_file_matches_generated(tmp_path):
+    path = tmp_path / "tables.bin"
+    tables.write(str(path))
+    assert bytes(tables.load(str(path))) == tables.generate()
+    # A file from another version is ignored.
+    path.write_bytes(b"XXXX" + path.read_bytes()[4:])
+    assert bytes(tables.load(str(path))) == tables.generate()
+
+
+def test_lookups():
+    assert tables.binomial(48, 9) == comb(48, 9)
+    assert tables.binomial(3, 5) == 0
+    for mask in [0, 0b1, 0b10110101, 0xFF]:
+        ranks = [rank for rank in range(1, 9) if mask >> (rank - 1) & 1]
+        for size in range(len(ranks) + 1):
+            for threshold in range(-2, 40):
+                expected = sum(
+                    sum(subset) >= threshold for subset in combinations(ranks, size)
+                )
+                assert tables.rank_tail(mask, size, threshold) == expected
@@ -0,0 +1,40 @@
+import json
+
+import tracing
+from readLine import handle_line
+from session import GameSession
+from test_draw import STATE
+
+
+def handle(message_id: int, state: dict):
+    line = json.dumps({"messageID": message_id, "state": state}) + "\n"
+    handle_line(line.encode(), GameSession())
+
+
+def test_trace_records_phases_and_counters(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(str(path))
+    try:
+        handle(1, {**STATE, "activeTurn": True})
+    finally:
+        tracing.configure(None)
+    capsys.readouterr()
+
+    [line] = path.read_text().splitlines()
+    record = json.loads(line)
+    assert record["messageID"] == 1
+    assert (record["subTurn"], record["activeTurn"]) == (0, True)
+    assert set(record["phases"]) == {"parse", "evaluate", "output"}
+    assert record["total"] >= sum(record["phases"].values()) > 0
+    assert record["counters"] and all(record["counters"].values())
+
+
+def test_nothing_is_written_with_tracing_off(tmp_path, capsys):
+    path = tmp_path / "trace.jsonl"
+    tracing.configure(str(path))
+    tracing.configure(None)
+    handle(1, {**STATE, "activeTurn": True})
+    capsys.readouterr()
+
+    assert not tracing.enabled
+    assert path.read_text() == ""
@@ -0,0 +1,88 @@
+import random
+
+from board import Board
+from referee import SUB_TURNS, Game
+from scoring import get_unknown_cards
+from session import GameSession
+from tracker import PILES, PLAY_AREAS, GameTracker
+
+
+def test_tracker_follows_a_game_without_rebuilding():
+    game = Game(random.Random(7))
+    tracker = GameTracker()
+    kept = None
+    active = 0
+    while game.deck:
+        game.turn += 1
+        for sub_turn, name in enumerate(SUB_TURNS):
+            state = game.state(0, active, sub_turn)
+            tracker.update(state)
+            assert tracker.unknown_cards == frozenset(get_unknown_cards(state))
+            for side in PLAY_AREAS:
+                board = Board.from_play_area(state[side])
+                assert tracker.boards[side].signature() == board.signature()
+                assert tracker.boards[side].play_cells() == board.play_cells()
+            for pile in PILES:
+                assert tracker.piles[pile] == [tuple(card) for card in state[pile]]
+
+            # Everything is updated in place once the game is under way.
+            current = [tracker.boards[side] for side in PLAY_AREAS]
+            current += [tracker.piles[pile] for pile in PILES]
+            if kept is not None:
+                assert all(a is b for a, b in zip(current, kept))
+            if game.turn > 1:
+                kept = current
+            getattr(game, name)(active, "RANDOM")
+        active = 1 - active
+
+
+def test_tracker_rebuilds_what_does_not_follow():
+    game = Game(random.Random(8))
+    for _ in range(6):
+        game.place(0, "RANDOM")
+        game.draw(0, 0)
+    tracker = GameTracker()
+    tracker.update(game.state(0, 0, 0))
+    # A state from another game replaces everything.
+    other = Game(random.Random(9))
+    other.discard(1, "RANDOM")
+    state = other.state(0, 0, 0)
+    tracker.update(state)
+    assert tracker.unknown_cards == frozenset(get_unknown_cards(state))
+    assert tracker.boards["playArea"].count == 0
+
+
+def test_tracker_rebuilds_a_grown_state_from_another_game():
+    for seed in range(20):
+        game = Game(random.Random(seed))
+        tracker = GameTracker()
+        for _ in range(3):
+            game.place(0, "RANDOM")
+            game.draw(0, 0)
+            tracker.update(game.state(0, 0, 0))
+
+        other = Game(random.Random(seed + 100))
+        for _ in range(3 + seed % 3):
+            other.place(0, "RANDOM")
+            other.draw(0, 0)
+        state = other.state(0, 0, 0)
+        tracker.update(state)
+        board = Board.from_play_area(state["playArea"])
+        assert tracker.boards["playArea"].signature() == board.signature()
+        assert tracker.unknown_cards == frozenset(get_unknown_cards(state))
+
+
+def test_session_tables_use_the_tracker():
+    game = Game(random.Random(10))
+    session = GameSession()
+    for turn in range(8):
+        game.turn = turn
+        state = game.state(0, 0, 2)
+        table = session.placement_table(state)
+        fresh = GameSession().placements.update(state)
+        assert table.unknown_cards == fresh.unknown_cards
+        assert table.cells == fresh.cells
+        assert table.scored.scores == fresh.scored.scores
+        assert table.best_values(state["hand"]) == fresh.best_values(state["hand"])
+        game.place(0, "RANDOM")
+        game.draw(0, 0)
@@ -0,0 +1,23 @@
+import magic
+from tune import pareto_front
+
+
+def test_pareto_front():
+    results = [
+        {"strength": 0.5, "p95": 0.010},
+        {"strength": 0.6, "p95": 0.020},
+        {"strength": 0.4, "p95": 0.030},
+        {"strength": 0.6, "p95": 0.015},
+    ]
+    front = pareto_front(results)
+    assert front == [results[0], results[3]]
+
+
+def test_magic_overrides_round_trip():
+    previous = magic.apply({"DRAW_LIM_CALCS": 10, "MOVE_BUDGETS": {"2": 0.5}})
+    try:
+        assert magic.DRAW_LIM_CALCS == 10
+        assert magic.MOVE_BUDGETS == {2: 0.5}
+    finally:
+        magic.apply(previous)
+    assert magic.DRAW_LIM_CALCS == previous["DRAW_LIM_CALCS"]
@@ -0,0 +1,42 @@
+import random
+
+import magic
+from bench import make_state
+from board import card_id, cell_coord
+from place import get_best_play
+from scoring import score_bounds, score_placement
+from session import GameSession
+
+
+def test_pruned_search_matches_exhaustive_search():
+    # With NumPy best_values() and get_best_play() take the batched path,
+    # covered in test_batch.py; this covers the pruned loops.
+    previous = magic.apply({"BATCH_SCORING": False})
+    try:
+        rng = random.Random(11)
+        for size in [0, 1, 4, 10, 20, 35] * 4:
+            state = make_state(rng, size)
+            table = GameSession().placement_table(state)
+            exhaustive = {}
+            for card in state["hand"]:
+                for cell in table.cells:
+                    value = table.value(card, cell)
+                    assert table.bound(card, cell) >= value
+                    bounds = score_bounds(table.scored, card_id(card), cell)
+                    scores = score_placement(table.scored, card_id(card), cell)
+                    assert all(b >= s for b, s in zip(bounds, scores.values()))
+                    best = exhaustive.get(tuple(card), 0.0)
+                    exhaustive[tuple(card)] = max(best, value)
+
+            session = GameSession()
+            pruned = session.placement_table(state).best_values(state["hand"])
+            assert pruned == [exhaustive[tuple(card)] for card in state["hand"]]
+
+            candidates = [
+                (card, cell) for card in state["hand"] for cell in table.cells
+            ]
+            values = [table.value(card, cell) for card, cell in candidates]
+            card, cell = candidates[values.index(max(values, default=0))]
+            assert get_best_play(state, GameSession()) == (card, cell_coord(cell))
+    finally:
+        magic.apply(previous)
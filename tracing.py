@@ -0,0 +1,74 @@
+"""
+Opt-in per-message tracing. When enabled, every message handled by
+readLine.beginReadLine is written as one JSON line with the time spent
+parsing, evaluating and writing the response, and the hot-path counters
+collected while evaluating it. When disabled, the hot paths only pay for
+an `if tracing.enabled` check.
+"""
+
+import json
+import sys
+from collections import Counter
+from time import perf_counter
+
+enabled = False
+counters = Counter()
+
+_output = None
+_start = 0.0
+_last = 0.0
+_phases = {}
+
+
+def configure(output: str = None):
+    """
+    Turns tracing on, writing to stderr if `output` is "stderr" and
+    appending to the file `output` otherwise. None turns tracing off.
+    """
+    global enabled, _output
+    if _output not in (None, sys.stderr):
+        _output.close()
+    if output is None:
+        enabled = False
+        _output = None
+    else:
+        enabled = True
+        _output = sys.stderr if output == "stderr" else open(output, "a")
+
+
+def begin():
+    """Starts timing a message that has just been read."""
+    global _start, _last, _phases
+    if not enabled:
+        return
+    counters.clear()
+    _start = _last = perf_counter()
+    _phases = {}
+
+
+def mark(phase: str):
+    """Attributes the time since the previous mark to `phase`."""
+    global _last
+    if not enabled:
+        return
+    now = perf_counter()
+    _phases[phase] = _phases.get(phase, 0.0) + now - _last
+    _last = now
+
+
+def finish(data: dict = None):
+    """Writes the record for the current message."""
+    if not enabled:
+        return
+    state = (data or {}).get("state", {})
+    record = {
+        "messageID": (data or {}).get("messageID"),
+        "turn": state.get("turn"),
+        "subTurn": state.get("subTurn"),
+        "activeTurn": state.get("activeTurn"),
+        "total": perf_counter() - _start,
+        "phases": _phases,
+        "counters": dict(counters),
+    }
+    _output.write(json.dumps(record) + "\n")
+    _output.flush()
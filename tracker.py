@@ -0,0 +1,159 @@
+"""
+Keeps a game's boards and card sets alive across its messages.
+
+Every message carries the full game state, but between two of our messages
+only a few cards move: each play area gains a card or two, each discard
+pile gains or loses its top card, and the hands change. GameTracker works
+out just that change and applies it to the boards and to the cards seen so
+far, rather than rebuilding them from the whole state. When a state does
+not follow from the last one that way (a new game, a skipped stretch of
+messages), the part that does not follow is rebuilt from the state.
+"""
+
+from typing import Dict, FrozenSet, List, Set
+
+import tracing
+from board import Board, card_id, cell_coord
+from scoring import ALL_CARDS, Card
+
+PLAY_AREAS = ["playArea", "opponentPlayArea"]
+PILES = ["discard", "opponentDiscard"]
+
+
+class GameTracker:
+    """
+    Both play areas as Boards, the cards on them and in the discard piles,
+    and the cards we have not seen, as of the last state passed to update().
+
+    versions counts the changes to each play area, so a table built from a
+    board can tell whether it is still current without comparing boards.
+    The boards are updated in place: copy one before changing it.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forgets everything, as at the start of a game."""
+        self.boards: Dict[str, Board] = {name: Board() for name in PLAY_AREAS}
+        self.versions = dict.fromkeys(PLAY_AREAS, 0)
+        self.placed: Dict[str, Set[Card]] = {name: set() for name in PLAY_AREAS}
+        self.piles: Dict[str, List[Card]] = {name: [] for name in PILES}
+        self.piled: Dict[str, Set[Card]] = {name: set() for name in PILES}
+        self.seen: Set[Card] = set()
+        self.unknown_cards: FrozenSet[Card] = frozenset(ALL_CARDS)
+
+    def update(self, state: dict) -> "GameTracker":
+        """Brings everything in line with a new game state."""
+        seen_count = len(self.seen)
+        for name in PLAY_AREAS:
+            self._update_board(name, state[name])
+        for name in PILES:
+            self._update_pile(name, state[name])
+        # Within a game a card once seen stays seen: it only moves between
+        # hands, play areas and piles. So the new cards are just added.
+        self.seen.update(tuple(card) for card in state["hand"])
+        self.seen.update(
+            tuple(card) for card in state["opponentHand"] if card is not None
+        )
+
+        # Every card we have not seen is in the deck or the opponent's hand.
+        # If the count is off, something was followed wrongly: read it all
+        # again.
+        hidden = state["deck"] + state["opponentHand"].count(None)
+        if len(ALL_CARDS) - len(self.seen) != hidden:
+            for name in PLAY_AREAS:
+                self._read_board(name, state[name])
+            for name in PILES:
+                self._read_pile(name, state[name])
+            self.seen = self._seen(state)
+            seen_count = None
+        # Keep the same frozenset while nothing new is seen, so its cached
+        # hash is reused by the probability caches.
+        if len(self.seen) != seen_count:
+            self.unknown_cards = frozenset(ALL_CARDS - self.seen)
+        return self
+
+    def _seen(self, state: dict) -> Set[Card]:
+        seen = set().union(*self.placed.values(), *self.piled.values())
+        seen.update(tuple(card) for card in state["hand"])
+        seen.update(tuple(card) for card in state["opponentHand"] if card is not None)
+        return seen
+
+    def _update_board(self, name: str, play_area: dict):
+        """
+        Places the cards added to `play_area` since the last state. A play
+        area only ever gains cards, so only its card count and the cells
+        around the board are looked at. If it lost cards, or the new ones
+        are not all found, the board is read again in full.
+        """
+        board = self.boards[name]
+        count = sum(map(len, play_area.values()))
+        if count == board.count:
+            return
+        if count > board.count:
+            self.versions[name] += 1
+            if self._place_new_cards(name, play_area, count):
+                return
+        self._read_board(name, play_area)
+
+    def _read_board(self, name: str, play_area: dict):
+        if tracing.enabled:
+            tracing.counters["tracker_rebuilds"] += 1
+        self.versions[name] += 1
+        self.boards[name] = Board.from_play_area(play_area)
+        self.placed[name] = {
+            tuple(card) for row in play_area.values() for card in row.values()
+        }
+        self.seen.update(self.placed[name])
+
+    def _place_new_cards(self, name: str, play_area: dict, count: int) -> bool:
+        """
+        Finds the cards added to `play_area` since the board was last
+        updated and places them. Every new card sits next to the board, or
+        next to another new card, so only the board's frontier is looked at.
+        Returns False if the cards could not all be found.
+        """
+        board = self.boards[name]
+        placed = self.placed[name]
+        while board.count < count:
+            found = False
+            for cell in board.play_cells():
+                x, y = (str(coord) for coord in cell_coord(cell))
+                card = play_area.get(x, {}).get(y)
+                if card is not None:
+                    board.place(cell, card_id(card))
+                    placed.add(tuple(card))
+                    self.seen.add(tuple(card))
+                    found = True
+            if not found:
+                return False
+        return True
+
+    def _update_pile(self, name: str, pile: list):
+        """
+        Follows a discard pile from its length and top card. Between two of
+        our messages a pile gains at most one card, its owner's discard, and
+        loses cards only from the top, so its new length and top card tell
+        which cards are still in it. Anything else is read again in full.
+        """
+        cards = self.piles[name]
+        piled = self.piled[name]
+        top = tuple(pile[-1]) if pile else None
+        if len(pile) == len(cards) and (not pile or top == cards[-1]):
+            return
+        if len(pile) == len(cards) + 1 and (not cards or tuple(pile[-2]) == cards[-1]):
+            cards.append(top)
+            piled.add(top)
+            self.seen.add(top)
+        elif len(pile) == len(cards) - 1 and (not pile or top == cards[-2]):
+            piled.discard(cards.pop())
+        else:
+            self._read_pile(name, pile)
+
+    def _read_pile(self, name: str, pile: list):
+        if tracing.enabled:
+            tracing.counters["tracker_rebuilds"] += 1
+        self.piles[name] = [tuple(card) for card in pile]
+        self.piled[name] = set(self.piles[name])
+        self.seen.update(self.piled[name])
@@ -0,0 +1,139 @@
+"""
+Tunes the magic.py constants that trade strength against latency.
+
+Each candidate config plays self-play games (referee.play_game) against the
+default config, taking each seat in turn, across a process pool. A config's
+strength is its score in those games (a win is 1, a draw 1/2) and its cost
+the p95 time it took per move. The configs no other config beats on both
+are the Pareto front; the strongest of them within --max-latency is written
+to --output, to be loaded at startup with MAGIC_CONFIG=<file>:
+
+    python tune.py --games 40 --output tuned.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+from multiprocessing import Pool
+from time import perf_counter
+
+from referee import MOVES, percentile, play_game
+
+# Candidate values for each tuned constant.
+SPACE = {
+    "DRAW_LIM_CALCS": [10000, 100000, 1000000],
+    "DISCARD_CANDIDATE_COUNT": [1, 3, 7],
+}
+
+
+def configs(samples: int, rng: random.Random) -> list:
+    """The whole grid, or `samples` configs drawn from it."""
+    names = list(SPACE)
+    grid = [dict(zip(names, values)) for values in itertools.product(*SPACE.values())]
+    if samples and samples < len(grid):
+        grid = rng.sample(grid, samples)
+    return grid
+
+
+def _play(task: tuple) -> tuple:
+    index, config, seed = task
+    # The candidate takes seat seed % 2, which moves first on even seeds.
+    seat = seed % 2
+    seats = (config, None) if seat == 0 else (None, config)
+    result = play_game(seed, seats)
+    ours, theirs = result["scores"][seat], result["scores"][1 - seat]
+    points = 1.0 if ours > theirs else 0.5 if ours == theirs else 0.0
+    latencies = [
+        latency for name in MOVES for latency in result["latencies"][seat][name]
+    ]
+    return index, points, ours - theirs, latencies
+
+
+def evaluate(candidates: list, games: int, processes: int, seed: int) -> list:
+    """Plays every candidate `games` times and summarises each."""
+    tasks = [
+        (index, config, seed + game)
+        for index, config in enumerate(candidates)
+        for game in range(games)
+    ]
+    points = [[] for _ in candidates]
+    margins = [[] for _ in candidates]
+    latencies = [[] for _ in candidates]
+    with Pool(processes) as pool:
+        for index, point, margin, times in pool.imap_unordered(_play, tasks):
+            points[index].append(point)
+            margins[index].append(margin)
+            latencies[index].extend(times)
+    return [
+        {
+            "config": config,
+            "strength": sum(points[index]) / len(points[index]),
+            "margin": sum(margins[index]) / len(margins[index]),
+            "p95": percentile(latencies[index], 0.95),
+        }
+        for index, config in enumerate(candidates)
+    ]
+
+
+def pareto_front(results: list) -> list:
+    """
+    The results that no other result matches on both strength and latency
+    while beating on one of them, fastest first.
+    """
+    front = [
+        result
+        for result in results
+        if not any(
+            other["strength"] >= result["strength"]
+            and other["p95"] <= result["p95"]
+            and (other["strength"] > result["strength"] or other["p95"] < result["p95"])
+            for other in results
+        )
+    ]
+    return sorted(front, key=lambda result: result["p95"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=20, help="games per config")
+    parser.add_argument(
+        "--samples", type=int, default=0, help="configs to try (0: all)"
+    )
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-latency", type=float, help="p95 seconds per move")
+    parser.add_argument("--output", help="write the chosen config to this JSON file")
+    args = parser.parse_args()
+
+    candidates = configs(args.samples, random.Random(args.seed))
+    start = perf_counter()
+    results = evaluate(candidates, args.games, args.processes, args.seed)
+    seconds = perf_counter() - start
+    print(f"{len(candidates)} configs x {args.games} games in {seconds:.1f}s")
+
+    front = pareto_front(results)
+    print(f"{'strength':>10}{'margin':>10}{'p95 ms':>10}  config")
+    for result in front:
+        print(
+            f"{result['strength']:>10.3f}"
+            f"{result['margin']:>10.2f}"
+            f"{result['p95'] * 1000:>10.2f}"
+            f"  {json.dumps(result['config'])}"
+        )
+
+    affordable = [
+        result
+        for result in front
+        if args.max_latency is None or result["p95"] <= args.max_latency
+    ]
+    if args.output and affordable:
+        chosen = max(affordable, key=lambda result: result["strength"])
+        with open(args.output, "w") as file:
+            json.dump(chosen["config"], file, indent=2)
+        print(f"Wrote {json.dumps(chosen['config'])} to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
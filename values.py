@@ -0,0 +1,203 @@
+import batch
+import magic
+import tracing
+from batch import BoardArrays, score_batch
+from board import Board, card_id
+from scoring import (
+    ALL_SPECIES,
+    ScoredBoard,
+    get_probability_inputs,
+    probabilities_from_inputs,
+    score_board,
+    score_bounds,
+    score_placement,
+    score_placements,
+    weight_scores,
+)
+from tracker import GameTracker
+
+
+class PlacementTable:
+    """
+    The value of placing each card on each cell of our play area, shared by
+    the draw, place and discard subturns.
+
+    A value is the per-species board score after the placement, weighted by
+    the scoring probabilities. The board scores are kept until the play area
+    changes; the probabilities, and so the values, are kept until the known
+    cards change. Both are filled in lazily as cards are looked at.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Forgets everything, as at the start of a game."""
+        self.signature = None
+        self.scored: ScoredBoard = None
+        self.arrays: BoardArrays = None
+        self.cells = set()
+        self.scores = {}
+        self.inputs = None
+        self.unknown_cards = frozenset()
+        self.probabilities = {}
+        self.values = {}
+
+    def update(
+        self, state: dict, tracker: GameTracker = None, side: str = "playArea"
+    ) -> "PlacementTable":
+        """
+        Brings the table in line with a new game state. With a tracker that
+        is up to date with the game, its board for the play area `side` (as
+        named in the game's own state) and its unknown cards are used rather
+        than rebuilt from `state`.
+        """
+        if tracker is None:
+            board = Board.from_play_area(state["playArea"])
+            signature = board.signature()
+            unknown_cards = None
+        else:
+            board = tracker.boards[side]
+            signature = (side, tracker.versions[side])
+            unknown_cards = tracker.unknown_cards
+        if signature != self.signature:
+            self.signature = signature
+            self.scored = score_board(board)
+            self.arrays = None
+            self.cells = board.play_cells()
+            self.scores = {}
+            self.values = {}
+
+        inputs = get_probability_inputs(state, unknown_cards)
+        if inputs != self.inputs:
+            self.inputs = inputs
+            self.unknown_cards = inputs[2]
+            self.probabilities = {}
+            self.values = {}
+        return self
+
+    def card_probabilities(self, card) -> dict:
+        """Scoring probabilities once `card` is on our play area."""
+        key = tuple(card)
+        probabilities = self.probabilities.get(key)
+        if probabilities is None:
+            probabilities = probabilities_from_inputs(self.inputs, card)
+            self.probabilities[key] = probabilities
+        return probabilities
+
+    def value(self, card, cell: int) -> float:
+        """Weighted score of our play area with `card` placed on `cell`."""
+        key = (card_id(card), cell)
+        value = self.values.get(key)
+        if tracing.enabled:
+            hit = value is not None
+            tracing.counters["value_cache_hits" if hit else "values_computed"] += 1
+        if value is None:
+            scores = self.scores.get(key)
+            if scores is None:
+                scores = score_placement(self.scored, key[0], cell)
+                self.scores[key] = scores
+            weighted_scores = weight_scores(scores, self.card_probabilities(card))
+            value = sum(weighted_scores.values())
+            self.values[key] = value
+        return value
+
+    def bound(self, card, cell: int) -> float:
+        """
+        An upper bound on value(card, cell), from score_bounds(). The species
+        are weighted and summed in the same order as in value(), so rounding
+        cannot take the bound below the value.
+        """
+        probabilities = self.card_probabilities(card)
+        bounds = score_bounds(self.scored, card_id(card), cell)
+        return sum(
+            bound * probabilities[species]
+            for species, bound in zip(ALL_SPECIES, bounds)
+        )
+
+    def batched(self) -> bool:
+        """Whether candidates are scored in NumPy batches (see batch.py)."""
+        return magic.BATCH_SCORING and batch.available()
+
+    def batch_values(self, placements) -> list:
+        """
+        value() for each (card, cell) placement, scored together by
+        score_batch(). The species are weighted and summed in the same order
+        as in value(), so the values are identical.
+        """
+        if self.arrays is None:
+            self.arrays = BoardArrays(self.scored)
+        scores = score_batch(
+            self.arrays, [(card_id(card), cell) for card, cell in placements]
+        )
+        rows = {}
+        for card, _ in placements:
+            key = tuple(card)
+            if key not in rows:
+                probabilities = self.card_probabilities(card)
+                rows[key] = [probabilities[species] for species in ALL_SPECIES]
+        weights = batch.np.array([rows[tuple(card)] for card, _ in placements])
+        weights = weights.reshape(-1, len(ALL_SPECIES))
+        values = scores[:, 0] * weights[:, 0]
+        for index in range(1, len(ALL_SPECIES)):
+            values = values + scores[:, index] * weights[:, index]
+        return values.tolist()
+
+    def best_value(self, card) -> float:
+        """Highest value of `card` over the cells it can be placed on."""
+        return self.best_values([card])[0]
+
+    def best_values(self, cards) -> list:
+        """
+        best_value() for each card. The cells are visited in order of the
+        highest bound there, and at each one the cards whose bound beats
+        their best value so far are scored together in one
+        score_placements() pass. The others cannot improve on it, so they
+        are skipped without changing the result. With NumPy every placement
+        is scored instead, in one batch.
+        """
+        unique = {card_id(card): card for card in cards}
+        if not unique:
+            return []
+        if self.batched():
+            cells = list(self.cells)
+            values = self.batch_values(
+                [(card, cell) for card in unique.values() for cell in cells]
+            )
+            width = len(cells)
+            best = {
+                card: max(values[row * width : (row + 1) * width], default=0.0)
+                for row, card in enumerate(unique)
+            }
+            return [max(best[card_id(card)], 0.0) for card in cards]
+        bounds = {
+            card: {cell: self.bound(unique[card], cell) for cell in self.cells}
+            for card in unique
+        }
+        best = dict.fromkeys(unique, 0.0)
+        order = sorted(
+            self.cells,
+            key=lambda cell: -max(bounds[card][cell] for card in unique),
+        )
+        pruned = 0
+        for cell in order:
+            live = []
+            for card in unique:
+                if bounds[card][cell] > best[card]:
+                    live.append(card)
+                else:
+                    pruned += 1
+            pending = [
+                card
+                for card in live
+                if (card, cell) not in self.values and (card, cell) not in self.scores
+            ]
+            if pending:
+                placements = score_placements(self.scored, pending, cell)
+                for card, scores in zip(pending, placements):
+                    self.scores[card, cell] = scores
+            for card in live:
+                best[card] = max(best[card], self.value(unique[card], cell))
+        if tracing.enabled:
+            tracing.counters["placements_pruned"] += pruned
+        return [best[card_id(card)] for card in cards]